@@ -0,0 +1,19 @@
+// Pages written by polls/artifacts.py are the same for every visitor, so the
+// CSRF fields they contain can't match the visitor's cookie. Django also
+// accepts the cookie secret itself as the form token: create the cookie when
+// there is none yet, and copy it into the forms.
+(function() {
+    var match = document.cookie.match(/(?:^|;\s*)csrftoken=([A-Za-z0-9]{32}|[A-Za-z0-9]{64})(?:;|$)/);
+    var secret = match && match[1];
+    if (!secret) {
+        var chars = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789';
+        secret = Array.from(window.crypto.getRandomValues(new Uint8Array(32)), function(byte) {
+            return chars[byte % chars.length];
+        }).join('');
+        document.cookie = 'csrftoken=' + secret + '; path=/; SameSite=Lax' +
+            (window.location.protocol === 'https:' ? '; Secure' : '');
+    }
+    document.querySelectorAll('input[name="csrfmiddlewaretoken"]').forEach(function(input) {
+        input.value = secret;
+    });
+})();
@@ -0,0 +1,43 @@
+"""
+Execute wrappers on every database connection of the process.
+
+connection.execute_wrapper() only covers one connection inside a with
+block. Profiling, the slow query log and the metrics want every query, so
+they register their wrapper once with install_execute_wrapper() and it is
+added to each connection when it is opened.
+
+Connections are per thread. request_started fires in the thread that will
+serve the request's queries (the sync thread under ASGI), so connections
+opened there before a wrapper was installed get it too.
+"""
+import re
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# SQLite says "database table is locked" for locks inside a shared cache
+LOCKED_RE = re.compile(r"database (table )?is locked")
+
+_wrappers = []
+
+
+def wrap_connection(sender, connection, **kwargs):
+    for wrapper in _wrappers:
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+def wrap_open_connections(**kwargs):
+    for connection in connections.all(initialized_only=True):
+        wrap_connection(None, connection)
+
+
+def install_execute_wrapper(wrapper):
+    """Runs `wrapper` around every query from now on; installing it again does nothing."""
+    if wrapper in _wrappers:
+        return
+    _wrappers.append(wrapper)
+    connection_created.connect(wrap_connection)
+    request_started.connect(wrap_open_connections)
+    wrap_open_connections()
@@ -0,0 +1,136 @@
+"""
+Prometheus metrics, served at /metrics in the text exposition format.
+
+Counters and histograms are only ever incremented; rates (votes per second)
+and ratios (cache hit ratio) are left to the queries, e.g.
+
+    rate(fairpoll_votes_total{outcome="accepted"}[1m])
+    sum(rate(fairpoll_cache_requests_total{result="hit"}[5m])) by (cache)
+      / sum(rate(fairpoll_cache_requests_total[5m])) by (cache)
+    histogram_quantile(0.95, rate(fairpoll_vote_seconds_bucket[5m]))
+
+Every gunicorn worker keeps its own values. When PROMETHEUS_MULTIPROC_DIR
+is set (it is in the Docker image), prometheus_client writes them to files
+in that directory and /metrics merges the files of all the workers, so any
+worker can answer the scrape. The directory must exist before any
+manage.py command imports this module (the image creates it) and be
+emptied before gunicorn starts; gunicorn.conf.py drops the files of workers
+that exit.
+
+Active polls are counted in the database rather than tracked by the
+workers, at most once a minute whatever the scrape interval.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from . import dbhooks
+
+VOTE_SECONDS = Histogram(
+    'fairpoll_vote_seconds', 'Time spent saving a ballot', ['kind'],
+)
+VOTES = Counter(
+    'fairpoll_votes', 'Ballots submitted, by outcome', ['kind', 'outcome'],
+)
+TALLY_SECONDS = Histogram(
+    'fairpoll_tally_seconds', 'Time spent computing Condorcet results, by number of ballots', ['ballots'],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30),
+)
+CACHE_REQUESTS = Counter(
+    'fairpoll_cache_requests', 'Cache lookups, by cache and result', ['cache', 'result'],
+)
+DATABASE_LOCKED = Counter(
+    'fairpoll_database_locked', '"database is locked" errors, raised once SQLite gave up retrying',
+)
+EVENT_STREAMS = Gauge(
+    'fairpoll_event_streams', 'Open server-sent event streams', multiprocess_mode='livesum',
+)
+
+ACTIVE_POLLS_CACHE_KEY = 'metrics:active-polls'
+ACTIVE_POLLS_CACHE_TIMEOUT = 60
+
+BALLOT_BUCKETS = [(100, '<100'), (1000, '<1k'), (10000, '<10k')]
+
+
+def ballots_label(count):
+    for limit, label in BALLOT_BUCKETS:
+        if count < limit:
+            return label
+    return '10k+'
+
+
+@contextmanager
+def observe_vote(kind):
+    """
+    Times the ballot saved in the block and counts it as accepted, or as
+    rejected when the block raises ValueError.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except ValueError:
+        VOTES.labels(kind, 'rejected').inc()
+        raise
+    except Exception:
+        VOTES.labels(kind, 'error').inc()
+        raise
+    else:
+        VOTES.labels(kind, 'accepted').inc()
+    finally:
+        VOTE_SECONDS.labels(kind).observe(time.perf_counter() - started)
+
+
+def count_cache(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def count_locked(execute, sql, params, many, context):
+    try:
+        return execute(sql, params, many, context)
+    except Exception as e:
+        if dbhooks.LOCKED_RE.search(str(e)):
+            DATABASE_LOCKED.inc()
+        raise
+
+
+def install():
+    dbhooks.install_execute_wrapper(count_locked)
+
+
+class ActivePollsCollector:
+    def describe(self):
+        yield GaugeMetricFamily('fairpoll_active_polls', 'Polls open for voting', labels=['kind'])
+
+    def collect(self):
+        from polls.models import HousePoll, QuickPoll
+
+        counts = cache.get_or_set(ACTIVE_POLLS_CACHE_KEY, lambda: {
+            'house': HousePoll.objects.active().count(),
+            'quick': QuickPoll.objects.active().count(),
+        }, ACTIVE_POLLS_CACHE_TIMEOUT)
+        gauge = GaugeMetricFamily('fairpoll_active_polls', 'Polls open for voting', labels=['kind'])
+        for kind, count in counts.items():
+            gauge.add_metric([kind], count)
+        yield gauge
+
+
+database_registry = CollectorRegistry()
+database_registry.register(ActivePollsCollector())
+
+
+def metrics_view(request):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    body = generate_latest(registry) + generate_latest(database_registry)
+    return HttpResponse(body, content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,181 @@
+"""
+Opt-in per-request profiling (PROFILING_ENABLED, off by default).
+
+When enabled, every request records its wall time, SQL query count and
+time, template render time and Condorcet tally time. The figures go out
+in a Server-Timing header (visible in the browser dev tools) and into a
+rolling window of the last PROFILING_WINDOW requests of this process,
+which staff can read at /profiling/ as the slowest endpoints.
+
+When disabled, the middleware removes itself at startup (MiddlewareNotUsed)
+and span() costs a context variable lookup.
+
+The current request's Profile lives in a context variable, so queries run
+through sync_to_async from async views are counted too.
+"""
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.shortcuts import render
+
+from . import dbhooks
+
+current_profile = ContextVar('current_profile', default=None)
+recent = deque(maxlen=getattr(settings, 'PROFILING_WINDOW', 2000))
+
+
+class Profile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.timings = {}
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0) + seconds
+
+    def server_timing(self, total):
+        parts = [f'total;dur={total * 1000:.1f}']
+        parts.append(f'db;dur={self.timings.get("db", 0) * 1000:.1f};desc="{self.queries} queries"')
+        for name, seconds in self.timings.items():
+            if name != 'db':
+                parts.append(f'{name};dur={seconds * 1000:.1f}')
+        return ', '.join(parts)
+
+
+@contextmanager
+def span(name):
+    """
+    Adds the time spent in the block to the current request's `name` timing.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.add('db', time.perf_counter() - started)
+
+
+_installed = False
+
+
+def install():
+    """
+    Hooks query and template timing into Django, once per process.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    dbhooks.install_execute_wrapper(record_query)
+
+    from django.template.backends.django import Template
+    render_template = Template.render
+
+    def timed_render(self, *args, **kwargs):
+        with span('template'):
+            return render_template(self, *args, **kwargs)
+    Template.render = timed_render
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        profile = Profile()
+        token = current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = Profile()
+        token = current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        match = request.resolver_match
+        recent.append((
+            match.view_name if match else '-',
+            total,
+            profile.queries,
+            profile.timings.get('db', 0),
+            profile.timings.get('template', 0),
+            profile.timings.get('tally', 0),
+        ))
+        response['Server-Timing'] = profile.server_timing(total)
+        return response
+
+
+def slowest_endpoints(limit):
+    """
+    Per-endpoint averages over the rolling window, slowest first.
+    """
+    by_endpoint = {}
+    for view_name, *figures in list(recent):
+        by_endpoint.setdefault(view_name, []).append(figures)
+    rows = []
+    for view_name, samples in by_endpoint.items():
+        count = len(samples)
+        totals = [sum(column) for column in zip(*samples)]
+        rows.append({
+            'endpoint': view_name,
+            'count': count,
+            'avg_ms': totals[0] / count * 1000,
+            'max_ms': max(sample[0] for sample in samples) * 1000,
+            'avg_queries': totals[1] / count,
+            'avg_db_ms': totals[2] / count * 1000,
+            'avg_template_ms': totals[3] / count * 1000,
+            'avg_tally_ms': totals[4] / count * 1000,
+        })
+    rows.sort(key=lambda row: row['avg_ms'], reverse=True)
+    return rows[:limit]
+
+
+@staff_member_required
+def report(request):
+    return render(request, 'profiling.html', {
+        'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+        'window': recent.maxlen,
+        'rows': slowest_endpoints(getattr(settings, 'PROFILING_TOP', 20)),
+    })
@@ -68,8 +68,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so it times the whole stack; removes itself unless PROFILING_ENABLED
+    'condorcet_backend.profiling.ProfilingMiddleware',
+    'condorcet_backend.slowqueries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    # Moves quick polls tracked in old sessions into cookies (see polls/tracking.py)
+    'polls.tracking.SessionListsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,6 +85,23 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request timings, Server-Timing header and /profiling/ (see
+# condorcet_backend/profiling.py)
+PROFILING_ENABLED = os.environ.get("DJANGO_PROFILING", "False") == "True"
+PROFILING_WINDOW = 2000
+PROFILING_TOP = 20
+
+# Statements slower than this are logged with their query plan to
+# data/logs/slow_queries.jsonl (see condorcet_backend/slowqueries.py).
+# Empty turns the log off.
+SLOW_QUERY_MS = os.environ.get("DJANGO_SLOW_QUERY_MS", "200")
+SLOW_QUERY_MS = float(SLOW_QUERY_MS) if SLOW_QUERY_MS else None
+
+# Processes drawing printable QR ticket sheets (see polls/ticket_sheets.py).
+# Every web worker starts its own pool on first use, so keep it small:
+# gunicorn runs 3 workers.
+TICKET_SHEET_WORKERS = int(os.environ.get("DJANGO_TICKET_SHEET_WORKERS", "2"))
+
 ROOT_URLCONF = 'condorcet_backend.urls'
 
 TEMPLATES = [
@@ -99,6 +121,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'condorcet_backend.wsgi.application'
+ASGI_APPLICATION = 'condorcet_backend.asgi.application'
 
 
 # Database
@@ -115,6 +138,75 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Shared by all the workers through Redis when REDIS_URL is set, as in
+# docker-compose.yml. Results, ticket filters and sheets, user search, the
+# rate limiter counters ("ratelimit") and the sessions live there.
+#
+# Without Redis (development), the default cache is files under data/cache.
+# FileBasedCache lists its whole directory on every write, so it is kept
+# small, and what is written on every request stays off it: sessions go to
+# the database only and the rate limiter counts per process.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "KEY_PREFIX": alias,
+        }
+        for alias in ("default", "ratelimit")
+    }
+    # Reads come from the cache, writes still reach the database
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("DJANGO_CACHE_DIR", DB_DIR / "cache"),
+            "OPTIONS": {"MAX_ENTRIES": 2000},
+        },
+        "ratelimit": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "ratelimit"},
+    }
+    SESSION_ENGINE = "django.contrib.sessions.backends.db"
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOG_DIR = DB_DIR / "logs"
+LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        # The slow query log is already one JSON object per record
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "slow_queries": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": LOG_DIR / "slow_queries.jsonl",
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "formatter": "message",
+            # Opened on the first slow query, not by every manage.py command
+            "delay": True,
+        },
+    },
+    "loggers": {
+        "condorcet_backend.slowqueries": {
+            "handlers": ["slow_queries"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -173,6 +265,13 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "assets"]
 STATIC_ROOT = BASE_DIR / "static"
 
+# collectstatic writes hashed names plus .gz/.br copies (see
+# condorcet_backend/storage.py); templates must use {% static %}
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "condorcet_backend.storage.CompressedManifestStaticFilesStorage"},
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -183,6 +282,23 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "users.User"
 
+# Buckets per endpoint (see polls/ratelimit.py): key parts, burst, requests
+# per second over a window of burst / rate seconds.
+RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "True") == "True"
+RATELIMITS = {
+    'vote': [
+        (('ip', 'poll', 'user'), 10, 1 / 6),
+        (('ip',), 120, 2),
+    ],
+    # Joining takes a guessed poll ID, so only the address counts
+    'join': [
+        (('ip',), 10, 1 / 3),
+    ],
+    'tickets': [
+        (('ip', 'poll'), 10, 1 / 6),
+    ],
+}
+
 SITE_ID = 1
 
 AUTHENTICATION_BACKENDS = [
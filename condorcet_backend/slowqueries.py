@@ -0,0 +1,114 @@
+"""
+Slow query log (SLOW_QUERY_MS, set it to None to turn it off).
+
+Every SQL statement of a request that takes longer than SLOW_QUERY_MS is
+written as one JSON line to the 'condorcet_backend.slowqueries' logger,
+which settings.LOGGING sends to data/logs/slow_queries.jsonl:
+
+    {"time": "...", "ms": 312.5, "view": "polls:quickpoll_results",
+     "path": "/en/polls/quick/AB12CD34/results/", "sql": "SELECT ...",
+     "plan": ["SCAN polls_ballot"], "scans": ["polls_ballot"]}
+
+"plan" is the output of EXPLAIN QUERY PLAN for the statement, run right
+after it on the same connection; "scans" lists the tables it reads in full
+(SCAN without an index), the usual reason a query is slow. Parameters are
+left out of the log, as they may hold e-mail addresses or ticket codes.
+
+    jq 'select(.scans | length > 0) | .view' data/logs/slow_queries.jsonl
+"""
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+from . import dbhooks
+
+logger = logging.getLogger(__name__)
+
+current_request = ContextVar('slow_query_request', default=None)
+
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+FULL_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)(?!\w| USING)')
+
+
+def explain(connection, sql, params):
+    """
+    Lines of EXPLAIN QUERY PLAN for `sql`, or None when it can't be explained.
+    """
+    if connection.vendor != 'sqlite' or not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    # A bare backend cursor: no execute wrappers, so no recursion
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+
+def log_slow_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        threshold = settings.SLOW_QUERY_MS
+        if threshold is not None and elapsed >= threshold:
+            request = current_request.get()
+            match = getattr(request, 'resolver_match', None)
+            plan = None if many else explain(context['connection'], sql, params)
+            logger.info(json.dumps({
+                'time': timezone.now().isoformat(),
+                'ms': round(elapsed, 1),
+                'view': match.view_name if match else None,
+                'path': request.path if request else None,
+                'sql': sql,
+                'plan': plan,
+                'scans': [m.group(1) for m in map(FULL_SCAN_RE.match, plan or []) if m],
+            }))
+
+
+def install():
+    dbhooks.install_execute_wrapper(log_slow_query)
+
+
+class SlowQueryMiddleware:
+    """
+    Makes the request visible to the query wrapper, which reads the view
+    name from it once the URL has been resolved.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if getattr(settings, 'SLOW_QUERY_MS', None) is None:
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
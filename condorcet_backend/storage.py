@@ -0,0 +1,59 @@
+"""
+Static files storage for production: collectstatic copies every file under
+a content-hashed name (style.3f2a9c1b0d4e.css, via ManifestStaticFilesStorage)
+and writes a gzip and a brotli copy next to each hashed text file.
+
+nginx serves the .gz copy with gzip_static (and the .br one with
+brotli_static when built with ngx_brotli), so nothing is compressed per
+request. A hashed name changes with the content, so nginx.conf lets
+browsers keep those files for a year without revalidating.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {'.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico', '.ttf', '.otf', '.eot'}
+# Smaller files fit in one packet anyway
+MIN_SIZE = 256
+
+
+def compress_file(path):
+    """
+    Writes `path`.gz and `path`.br, skipping a variant that already exists
+    (hashed names are never reused for new content) or would not be smaller.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < MIN_SIZE:
+        return
+    variants = [('.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', lambda: brotli.compress(data, quality=11)))
+    for suffix, compress in variants:
+        target = path + suffix
+        if os.path.exists(target):
+            continue
+        compressed = compress()
+        if len(compressed) < len(data):
+            with open(target, 'wb') as f:
+                f.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(hashed):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                compress_file(self.path(name))
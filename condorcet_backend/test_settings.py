@@ -0,0 +1,25 @@
+"""
+Settings for `manage.py test`, which picks this module unless
+DJANGO_SETTINGS_MODULE says otherwise (see manage.py).
+"""
+import tempfile
+from pathlib import Path
+
+from .settings import *  # noqa: F401,F403
+from .settings import LOGGING, STORAGES
+
+# Private caches that start empty on every run, used like Redis in production
+CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": alias}
+    for alias in ("default", "ratelimit")
+}
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Tests lower the slow query threshold to check the log, keep that out of data/logs
+LOGGING["handlers"]["slow_queries"] = {"class": "logging.NullHandler"}
+
+# Results published by the tests (polls/artifacts.py) stay out of media/
+MEDIA_ROOT = Path(tempfile.gettempdir()) / "fairpoll-test-media"
+
+# No collectstatic before the tests, hence no manifest
+STORAGES = {**STORAGES, "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}}
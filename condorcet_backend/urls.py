@@ -52,18 +52,22 @@ def robot_redirect(request):
     return redirect("robots_txt", permanent=True)
 
 from polls import views as polls_views
+from condorcet_backend import metrics, profiling
 
 urlpatterns = [
     path("i18n/", include("django.conf.urls.i18n")),
     path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="django.contrib.sitemaps.views.sitemap"),
     path("robots.txt", robots_txt, name="robots_txt"),
     path("robot.txt", robot_redirect),
+    # Scraped by Prometheus inside the Docker network, not exposed by nginx
+    path("metrics", metrics.metrics_view, name="metrics"),
 ]
 
 urlpatterns += i18n_patterns(
     path("", root_home, name="home"),
     path("about/", TemplateView.as_view(template_name="about.html"), name="about"),
     path("statistics", polls_views.statistics, name="statistics"),
+    path("profiling/", profiling.report, name="profiling"),
     path("admin/", admin.site.urls),
     path("account/", include("allauth.urls")),
     path("", include((tf_urls[0], "two_factor"), namespace="two_factor")),
@@ -0,0 +1,10 @@
+# Read by gunicorn from the working directory
+import os
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Forget the live gauges of a dead worker (see condorcet_backend/metrics.py)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -24,6 +24,16 @@ class House(models.Model):
         """Returns the users belonging to this house."""
         return self.members.all()
 
+    def has_member(self, user):
+        """Membership check that doesn't load the member list."""
+        if not user.is_authenticated:
+            return False
+        return self.members.filter(pk=user.pk).exists()
+
+    def has_active_poll(self, poll_type):
+        """Whether an unfinished poll of the given type is already running."""
+        return self.polls.filter(poll_type=poll_type).active().exists()
+
     def create_governance_poll(self, question, poll_type):
         """
         Helper to create a governance poll (banishment, integration, deletion)
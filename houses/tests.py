@@ -0,0 +1,75 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from polls.models import HousePoll, Ballot
+from houses.models import House
+from django.utils import timezone
+from datetime import timedelta
+
+User = get_user_model()
+
+class HouseQueryBudgetTest(TestCase):
+    """
+    The house views must issue the same number of queries whatever the
+    number of members or polls in the house (the session comes from the
+    cache, so it is not counted).
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='password')
+        self.house = House.objects.create(name='Test House', creator=self.user)
+        self.house.members.add(self.user)
+        self.client = Client()
+        self.client.login(username='owner', password='password')
+
+    def grow_house(self, members, polls):
+        users = [User(username=f'member{self.house.members.count()}_{i}') for i in range(members)]
+        for user in User.objects.bulk_create(users):
+            user.houses.add(self.house)
+        for i in range(polls):
+            poll = HousePoll.objects.create(
+                question=f'Question {i}?',
+                options=['Yes', 'No'],
+                house=self.house,
+                creator=self.user,
+                dead_line=timezone.now() + timedelta(days=1 if i % 2 else -1),
+                max_participants=10,
+            )
+            Ballot.objects.create(poll=poll, choices={'Yes': 1, 'No': 2})
+
+    def test_house_detail_query_count_is_constant(self):
+        url = reverse('houses:house_detail', kwargs={'pk': self.house.pk})
+        self.grow_house(members=1, polls=2)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        self.grow_house(members=20, polls=20)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['active_polls']), 11)
+        self.assertEqual(len(response.context['archived_polls']), 11)
+
+    def test_governance_guards_query_count_is_constant(self):
+        url = reverse('houses:create_integration_poll', kwargs={'pk': self.house.pk})
+        self.grow_house(members=1, polls=2)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+        self.grow_house(members=20, polls=20)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_active_governance_poll_blocks_a_new_one(self):
+        self.house.create_governance_poll('Delete?', HousePoll.POLL_TYPE_DELETION)
+        url = reverse('houses:create_deletion_poll', kwargs={'pk': self.house.pk})
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse('houses:house_detail', kwargs={'pk': self.house.pk}))
+        self.assertEqual(self.house.polls.filter(poll_type=HousePoll.POLL_TYPE_DELETION).count(), 1)
+
+    def test_non_member_cannot_start_governance_poll(self):
+        User.objects.create_user(username='outsider', password='password')
+        self.client.login(username='outsider', password='password')
+        url = reverse('houses:create_integration_poll', kwargs={'pk': self.house.pk})
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse('houses:house_detail', kwargs={'pk': self.house.pk}))
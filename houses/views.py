@@ -5,12 +5,12 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from dal import autocomplete
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 from django.utils.translation import gettext as _, gettext_lazy as _l
 from dal import autocomplete
 from .models import House
 from .forms import HouseForm, IntegrationPollForm, BanishmentPollForm
 from polls.models import HousePoll
+from users.search import search_user_ids
 
 class UserAutocomplete(autocomplete.Select2QuerySetView):
     def get_queryset(self):
@@ -21,14 +21,16 @@ class UserAutocomplete(autocomplete.Select2QuerySetView):
         qs = get_user_model().objects.all()
 
         if self.q:
-            qs = qs.filter(Q(username__icontains=self.q) | Q(email__icontains=self.q))
+            # Prefix search through the users search index instead of a full
+            # icontains scan of the user table on every keystroke.
+            qs = qs.filter(pk__in=search_user_ids(self.q))
 
-        return qs
+        return qs.order_by('username')
 
 @login_required
 def house_list(request):
-    my_houses = request.user.houses.all()
-    other_houses = House.objects.exclude(id__in=my_houses.values_list('id', flat=True))
+    my_houses = request.user.houses.select_related('creator')
+    other_houses = House.objects.select_related('creator').exclude(id__in=my_houses.values_list('id', flat=True))
     return render(request, 'houses/house_list.html', {
         'my_houses': my_houses,
         'other_houses': other_houses
@@ -48,14 +50,16 @@ def house_create(request):
 
 @login_required
 def house_detail(request, pk):
-    house = get_object_or_404(House, pk=pk)
-    all_polls = house.polls.all().order_by('-ballot_count_time')[:100]
-    
+    house = get_object_or_404(House.objects.select_related('creator'), pk=pk)
+    # is_finished reads the annotated ballot_count, so splitting is query-free
+    all_polls = house.polls.with_ballot_count().order_by('-ballot_count_time')[:100]
+
     active_polls = [p for p in all_polls if not p.is_finished]
     archived_polls = [p for p in all_polls if p.is_finished]
 
     return render(request, 'houses/house_detail.html', {
         'house': house,
+        'is_member': house.has_member(request.user),
         'members': house.users,
         'active_polls': active_polls,
         'archived_polls': archived_polls
@@ -64,12 +68,11 @@ def house_detail(request, pk):
 @login_required
 def create_integration_poll(request, pk):
     house = get_object_or_404(House, pk=pk)
-    if request.user not in house.users:
+    if not house.has_member(request.user):
          messages.error(request, _("Only members can start governance polls."))
          return redirect('houses:house_detail', pk=pk)
          
-    active_integration_polls = [p for p in house.polls.filter(poll_type=HousePoll.POLL_TYPE_INTEGRATION) if not p.is_finished]
-    if active_integration_polls:
+    if house.has_active_poll(HousePoll.POLL_TYPE_INTEGRATION):
          messages.error(request, _("An active integration poll already exists."))
          return redirect('houses:house_detail', pk=pk)
 
@@ -90,12 +93,11 @@ def create_integration_poll(request, pk):
 @login_required
 def create_banishment_poll(request, pk):
     house = get_object_or_404(House, pk=pk)
-    if request.user not in house.users and request.user != house.creator:
+    if not house.has_member(request.user) and request.user.pk != house.creator_id:
          messages.error(request, _("Only members can start governance polls."))
          return redirect('houses:house_detail', pk=pk)
 
-    active_banishment_polls = [p for p in house.polls.filter(poll_type=HousePoll.POLL_TYPE_BANISHMENT) if not p.is_finished]
-    if active_banishment_polls:
+    if house.has_active_poll(HousePoll.POLL_TYPE_BANISHMENT):
          messages.error(request, _("An active banishment poll already exists."))
          return redirect('houses:house_detail', pk=pk)
 
@@ -114,12 +116,11 @@ def create_banishment_poll(request, pk):
 @login_required
 def create_deletion_poll(request, pk):
     house = get_object_or_404(House, pk=pk)
-    if request.user not in house.users and request.user != house.creator:
+    if not house.has_member(request.user) and request.user.pk != house.creator_id:
          messages.error(request, _("Only members can start governance polls."))
          return redirect('houses:house_detail', pk=pk)
 
-    active_deletion_polls = [p for p in house.polls.filter(poll_type=HousePoll.POLL_TYPE_DELETION) if not p.is_finished]
-    if active_deletion_polls:
+    if house.has_active_poll(HousePoll.POLL_TYPE_DELETION):
          messages.error(request, _("An active deletion poll already exists."))
          return redirect('houses:house_detail', pk=pk)
 
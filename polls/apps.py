@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class PollsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'polls'
+
+    def ready(self):
+        from condorcet_backend import metrics
+        from . import artifacts  # noqa: F401
+        metrics.install()
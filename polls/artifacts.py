@@ -0,0 +1,108 @@
+"""
+Pre-rendered results of finished quick polls, served by nginx.
+
+A finished poll never changes, so `manage.py publish_results` (run every
+minute by docker-compose.yml) writes its results once under
+MEDIA_ROOT/results/<external_id>/:
+
+    <language>.html  the results page an anonymous visitor gets, for each
+                     of LANGUAGES
+    export.json      the body of .../export/ (default JSON format)
+    digest.json      the body of .../export/?format=digest
+
+nginx.conf answers the matching URLs from these files and only falls back
+to Django, which never writes them, when a file is missing. The pages go to visitors without a
+session, pending messages or created polls cookie: the page would look the
+same to them. Such hits are not recorded in PollLog.
+
+Every file is written under a temporary name and renamed, so nginx never
+sees a partial file; digest.json is written last and marks the poll as
+published. The directory is removed with its poll.
+
+House polls are left out: their results page applies governance decisions
+and is meant for the members of the house.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.http import HttpRequest
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import translation
+
+from .exports import iter_export
+from .models import QuickPoll
+
+DIRECTORY = 'results'
+
+
+def poll_directory(external_id):
+    return Path(settings.MEDIA_ROOT) / DIRECTORY / external_id
+
+
+def is_published(poll):
+    return (poll_directory(poll.external_id) / 'digest.json').exists()
+
+
+class AnonymousRequest(HttpRequest):
+    """GET of `scheme`://`host``path` by a visitor without cookies."""
+    def __init__(self, host, scheme, path, language):
+        super().__init__()
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.host = host
+        self.site_scheme = scheme
+        self.LANGUAGE_CODE = language
+        self.user = AnonymousUser()
+
+    def get_host(self):
+        return self.host
+
+    def _get_scheme(self):
+        return self.site_scheme
+
+
+def write_file(path, chunks):
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}')
+    with open(temporary, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temporary, path)
+
+
+def publish(poll, host, scheme='https'):
+    """
+    Writes the artifacts of finished quick poll `poll` (annotated with its
+    ballot count) unless they exist, with links to `scheme`://`host`.
+    Returns True when they were written.
+    """
+    from .views import export_digest, results_context
+
+    if not poll.is_finished or is_published(poll):
+        return False
+    directory = poll_directory(poll.external_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    context = results_context(poll, is_creator=False)
+    context['prerendered'] = True
+    for language, _name in settings.LANGUAGES:
+        with translation.override(language):
+            path = reverse('polls:quickpoll_results', args=[poll.external_id])
+            request = AnonymousRequest(host, scheme, path, language)
+            html = render_to_string('polls/poll_results.html', context, request=request)
+        write_file(directory / f'{language}.html', [html])
+    write_file(directory / 'export.json', iter_export(poll, 'json'))
+    # Same bytes as the JsonResponse of the export view
+    write_file(directory / 'digest.json', [json.dumps(export_digest(poll), cls=DjangoJSONEncoder)])
+    return True
+
+
+@receiver(post_delete, sender=QuickPoll)
+def unpublish(sender, instance, **kwargs):
+    shutil.rmtree(poll_directory(instance.external_id), ignore_errors=True)
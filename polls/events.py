@@ -0,0 +1,131 @@
+"""
+Live ballot counts over server-sent events.
+
+Each worker process has one Broadcaster. A poll that has at least one
+listener gets a single watcher task: it reads the ballot count (one query)
+every POLL_INTERVAL seconds, or straight away when a vote is cast in this
+process, and hands every change to the queues of all the open streams.
+Votes taken by other workers show up at the next check.
+
+Events sent to the browser:
+    count   {"ballot_count": 12, "finished": false}
+    closed  same payload, sent once when the poll finishes; the stream ends
+"""
+import asyncio
+import json
+
+from condorcet_backend import metrics
+
+POLL_INTERVAL = 2  # seconds between two database checks
+KEEPALIVE = 15  # seconds of silence before a comment line is sent
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def poll_state(model, pk):
+    poll = await model.objects.with_ballot_count().filter(pk=pk).afirst()
+    if poll is None:
+        return None
+    return {'ballot_count': poll.ballot_count, 'finished': poll.is_finished}
+
+
+class Broadcaster:
+    def __init__(self):
+        self.listeners = {}
+        self.wakeups = {}
+        self.watchers = {}
+        self.loop = None
+
+    def notify(self, poll):
+        """
+        Wakes the watcher of `poll`, if any, so listeners see a new ballot
+        without waiting for the next check. Safe to call from sync code.
+        """
+        wakeup = self.wakeups.get((type(poll), poll.pk))
+        if wakeup is None or self.loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            wakeup.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(wakeup.set)
+
+    async def stream(self, poll):
+        """
+        Async generator of SSE lines for `poll`, which must be annotated
+        with its ballot count.
+        """
+        state = {'ballot_count': poll.ballot_count, 'finished': poll.is_finished}
+        if state['finished']:
+            yield format_event('closed', state)
+            return
+
+        key = (type(poll), poll.pk)
+        queue = asyncio.Queue()
+        self.subscribe(key, queue)
+        try:
+            yield format_event('count', state)
+            while True:
+                try:
+                    new_state = await asyncio.wait_for(queue.get(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if new_state is None:
+                    # Poll deleted
+                    return
+                if new_state == state:
+                    continue
+                state = new_state
+                if state['finished']:
+                    yield format_event('closed', state)
+                    return
+                yield format_event('count', state)
+        finally:
+            self.unsubscribe(key, queue)
+
+    def subscribe(self, key, queue):
+        self.loop = asyncio.get_running_loop()
+        self.listeners.setdefault(key, set()).add(queue)
+        metrics.EVENT_STREAMS.inc()
+        if key not in self.wakeups:
+            self.wakeups[key] = asyncio.Event()
+            self.watchers[key] = asyncio.create_task(self.watch(key))
+
+    def unsubscribe(self, key, queue):
+        metrics.EVENT_STREAMS.dec()
+        queues = self.listeners.get(key)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.listeners[key]
+                # Let the watcher notice straight away that nobody listens
+                if key in self.wakeups:
+                    self.wakeups[key].set()
+
+    async def watch(self, key):
+        model, pk = key
+        wakeup = self.wakeups[key]
+        try:
+            while self.listeners.get(key):
+                state = await poll_state(model, pk)
+                for queue in self.listeners.get(key, ()):
+                    queue.put_nowait(state)
+                if state is None or state['finished']:
+                    break
+                try:
+                    await asyncio.wait_for(wakeup.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+        finally:
+            del self.wakeups[key]
+            del self.watchers[key]
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,106 @@
+"""
+Streaming ballot exports.
+
+Ballots are read with a chunked iterator and serialized one at a time, so
+memory stays flat however large the poll is. Every ballot gets a stable
+key: its ticket code when it has one, "Anonymous-<ballot id>" otherwise.
+
+Mirrors can fetch only new ballots with ?since=<cursor> (a ballot id or an
+ISO timestamp) and compare their own tally against ?format=digest.
+
+Under ASGI the same generators are pulled through aiter_chunks(), one
+chunk per trip to a worker thread.
+"""
+import csv
+import hashlib
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def matrix_digest(matrix):
+    """
+    SHA-256 of the pairwise matrix serialized as compact JSON with sorted
+    keys, i.e. json.dumps(matrix, sort_keys=True, separators=(',', ':')).
+    """
+    canonical = json.dumps(matrix, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def ballot_key(ballot_id, ticket_code):
+    return ticket_code or f"Anonymous-{ballot_id}"
+
+
+def ballot_rows(ballots):
+    """
+    Yields (key, timestamp, choices) for each ballot of the queryset, in
+    ballot id order.
+    """
+    rows = ballots.order_by('pk').values_list('pk', 'ticket__code', 'timestamp', 'choices')
+    for ballot_id, ticket_code, timestamp, choices in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield ballot_key(ballot_id, ticket_code), timestamp, choices
+
+
+def iter_json(poll, rows):
+    """
+    Same document as json.dumps({key: choices, ...}, indent=2), streamed.
+    """
+    first = True
+    for key, _timestamp, choices in rows:
+        body = json.dumps(choices, indent=2).replace('\n', '\n  ')
+        yield ('{\n' if first else ',\n') + f'  {json.dumps(key)}: {body}'
+        first = False
+    yield '{}' if first else '\n}'
+
+
+def iter_ndjson(poll, rows):
+    for key, timestamp, choices in rows:
+        yield json.dumps({'key': key, 'timestamp': timestamp.isoformat(), 'choices': choices}) + '\n'
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it."""
+    def write(self, value):
+        return value
+
+
+def iter_csv(poll, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['key', 'timestamp', *poll.options])
+    for key, timestamp, choices in rows:
+        ranks = [choices.get(option, '') for option in poll.options] if isinstance(choices, dict) else []
+        yield writer.writerow([key, timestamp.isoformat(), *ranks])
+
+
+SERIALIZERS = {
+    'json': iter_json,
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
+
+
+def iter_export(poll, fmt, ballots=None):
+    if ballots is None:
+        ballots = poll.ballots.all()
+    return SERIALIZERS[fmt](poll, ballot_rows(ballots))
+
+
+async def aiter_chunks(iterator, size=CHUNK_SIZE):
+    """
+    Async iterator over a sync one, fetching `size` items at a time in the
+    request's worker thread (the database cursor must stay on one thread).
+    """
+    iterator = iter(iterator)
+    next_chunk = sync_to_async(lambda: list(islice(iterator, size)))
+    while chunk := await next_chunk():
+        for item in chunk:
+            yield item
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+# Fingerprint of the collected sources, kept next to the collected files
+FINGERPRINT_NAME = ".sources.sha256"
+
+
+def static_fingerprint():
+    """
+    SHA-256 over the storage backend and the path and content of every file
+    collectstatic would copy (the first one found wins, as in collectstatic).
+    """
+    ignore_patterns = apps.get_app_config("staticfiles").ignore_patterns
+    digest = hashlib.sha256(settings.STORAGES["staticfiles"]["BACKEND"].encode())
+    seen = set()
+    for finder in finders.get_finders():
+        for path, storage in finder.list(ignore_patterns):
+            prefix = getattr(storage, "prefix", None)
+            prefixed_path = os.path.join(prefix, path) if prefix else path
+            if prefixed_path in seen:
+                continue
+            seen.add(prefixed_path)
+            digest.update(prefixed_path.encode() + b"\0")
+            with storage.open(path) as f:
+                for block in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepares a container in one process: applies pending migrations, collects "
+        "static files when their sources changed and sets the Site domain and name. "
+        "Steps with nothing to do are skipped; the time of each step is reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--domain", default=os.environ.get("SITE_DOMAIN", "fairpoll.org"))
+        parser.add_argument("--name", default=os.environ.get("SITE_NAME", "FairPoll"))
+        parser.add_argument("--force-static", action="store_true", help="Collect static files even if unchanged")
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        started = time.perf_counter()
+        self.step("migrate", self.migrate)
+        self.step("collectstatic", self.collectstatic, options["force_static"])
+        self.step("site", self.site, options["domain"], options["name"])
+        self.stdout.write(self.style.SUCCESS(f"Bootstrap done in {time.perf_counter() - started:.2f}s"))
+
+    def step(self, name, func, *args):
+        started = time.perf_counter()
+        outcome = func(*args)
+        self.stdout.write(f"{name:<14} {outcome:<45} {time.perf_counter() - started:6.2f}s")
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan:
+            return "skipped, no pending migration"
+        call_command("migrate", interactive=False, verbosity=max(self.verbosity - 1, 0))
+        return f"applied {len(plan)} migration(s)"
+
+    def collectstatic(self, force):
+        fingerprint = static_fingerprint()
+        stamp = os.path.join(settings.STATIC_ROOT, FINGERPRINT_NAME)
+        manifest_name = getattr(staticfiles_storage, "manifest_name", None)
+        try:
+            with open(stamp) as f:
+                unchanged = f.read().strip() == fingerprint
+        except FileNotFoundError:
+            unchanged = False
+        if manifest_name and not staticfiles_storage.exists(manifest_name):
+            unchanged = False
+        if unchanged and not force:
+            return "skipped, sources unchanged"
+        call_command("collectstatic", interactive=False, verbosity=max(self.verbosity - 1, 0))
+        with open(stamp, "w") as f:
+            f.write(fingerprint + "\n")
+        return "collected"
+
+    def site(self, domain, name):
+        site, created = Site.objects.get_or_create(id=settings.SITE_ID, defaults={"domain": domain, "name": name})
+        if created:
+            return f"created {domain}"
+        if (site.domain, site.name) == (domain, name):
+            return "skipped, unchanged"
+        site.domain, site.name = domain, name
+        site.save(update_fields=["domain", "name"])
+        return f"updated to {domain}"
@@ -0,0 +1,81 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.models import PollCode, ranking_to_choices, resolve_external_id
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports offline (paper) ballots into a poll. "
+        "CSV files have one column per option holding its rank, plus an optional "
+        "'ticket' column. NDJSON files have one object per line with either "
+        "'ranking' (options, best first) or 'choices' ({option: rank}), and an "
+        "optional 'ticket'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("external_id", help="Poll ID")
+        parser.add_argument("path", help="CSV or NDJSON file")
+        parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            model, pk = resolve_external_id(options["external_id"])
+        except PollCode.DoesNotExist:
+            raise CommandError("Poll not found.")
+        poll = model.objects.get(pk=pk)
+
+        path = Path(options["path"])
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        if fmt not in ("csv", "ndjson"):
+            raise CommandError("Unknown format, use --format csv or --format ndjson.")
+
+        started = time.monotonic()
+        with path.open(newline="", encoding="utf-8") as handle:
+            try:
+                if fmt == "csv":
+                    entries = self.read_csv(handle, poll.options)
+                else:
+                    entries = self.read_ndjson(handle, poll.options)
+                count = poll.import_ballots(entries, batch_size=options["batch_size"])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {count} ballots into {poll.external_id} in {time.monotonic() - started:.2f}s."
+        ))
+
+    def read_csv(self, handle, options):
+        reader = csv.DictReader(handle)
+        missing = set(options) - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError("Missing columns: %s" % ", ".join(sorted(missing)))
+        entries = []
+        for line, row in enumerate(reader, 2):
+            try:
+                choices = {option: int(row[option]) for option in options}
+            except (TypeError, ValueError):
+                raise ValueError(f"Line {line}: ranks must be whole numbers.")
+            entries.append((choices, (row.get("ticket") or "").strip() or None))
+        return entries
+
+    def read_ndjson(self, handle, options):
+        entries = []
+        for line, raw in enumerate(handle, 1):
+            if not raw.strip():
+                continue
+            try:
+                data = json.loads(raw)
+                if "ranking" in data:
+                    choices = ranking_to_choices(options, data["ranking"])
+                else:
+                    choices = data["choices"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Line {line}: {e}")
+            entries.append((choices, data.get("ticket") or None))
+        return entries
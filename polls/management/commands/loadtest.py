@@ -0,0 +1,290 @@
+import math
+import random
+import re
+import threading
+import time
+from datetime import timedelta
+from http.cookies import SimpleCookie
+from urllib import error, parse, request as urlrequest
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from condorcet_backend.dbhooks import LOCKED_RE
+from polls.models import QuickPoll, PollCode, resolve_external_id
+from polls.views import MAX_QUICKPOLL
+
+ENDPOINTS = ["create", "tickets", "detail", "vote_form", "vote", "results"]
+RANK_FIELD_RE = re.compile(r'name="rank_(\d+)"')
+
+
+class LocalDevice:
+    """A browser talking to this process through the test client."""
+
+    def __init__(self, ip):
+        self.client = Client(REMOTE_ADDR=ip)
+
+    def request(self, method, path, data=None):
+        if method == "POST":
+            response = self.client.post(path, data)
+        else:
+            response = self.client.get(path)
+        if response.streaming:
+            body = b"".join(response.streaming_content)
+        else:
+            body = response.content
+        return response.status_code, response.get("Location", ""), body
+
+
+class _NoRedirect(urlrequest.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class RemoteDevice:
+    """
+    A browser talking to a live server. Cookies are kept by hand: the
+    session and CSRF cookies are marked Secure, and a cookie jar would not
+    send them back to a plain http:// test server.
+
+    The device address goes in X-Forwarded-For, which only tells devices
+    apart when the server is reached directly: nginx appends the real
+    address, and that is the one the rate limits use.
+    """
+
+    opener = urlrequest.build_opener(_NoRedirect)
+
+    def __init__(self, base_url, ip):
+        self.base_url = base_url.rstrip("/")
+        self.ip = ip
+        self.cookies = {}
+
+    def request(self, method, path, data=None):
+        url = self.base_url + path
+        headers = {"X-Forwarded-For": self.ip, "Referer": url}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        body = None
+        if method == "POST":
+            data = dict(data or {}, csrfmiddlewaretoken=self.cookies.get("csrftoken", ""))
+            body = parse.urlencode(data).encode()
+        req = urlrequest.Request(url, data=body, headers=headers, method=method)
+        try:
+            response = self.opener.open(req, timeout=60)
+        except error.HTTPError as e:
+            response = e
+        with response:
+            for header in response.headers.get_all("Set-Cookie") or []:
+                for name, morsel in SimpleCookie(header).items():
+                    self.cookies[name] = morsel.value
+            return response.status, response.headers.get("Location", ""), response.read()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives concurrent voters through create -> detail -> vote -> results and "
+        "reports latency percentiles and error rates per endpoint. "
+        "Without --url, requests go through the test client against the configured "
+        "database, which --in-process must confirm: run it on a copy, since quick "
+        f"polls beyond the limit of {MAX_QUICKPOLL} replace the oldest ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Base URL of a running server (default: in-process test client)")
+        parser.add_argument("--concurrency", type=int, default=8, help="Number of voter threads")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+        parser.add_argument("--votes", type=int, help="Stop after this many vote attempts")
+        parser.add_argument("--polls", type=int, default=1, help="Synthetic polls to create")
+        parser.add_argument("--poll", action="append", default=[], dest="reuse",
+                            help="Reuse an existing poll instead (repeatable)")
+        parser.add_argument("--options", type=int, default=5, help="Options per synthetic poll")
+        parser.add_argument("--participants", type=int, default=1000,
+                            help="Max participants (and tickets) per synthetic poll")
+        parser.add_argument("--tickets", action="store_true", help="Create ticket-secured polls")
+        parser.add_argument("--keep", action="store_true", help="Keep the synthetic polls (in-process mode)")
+        parser.add_argument("--in-process", action="store_true",
+                            help="Without --url, write the synthetic polls and votes to the configured database")
+
+    def handle(self, *args, **options):
+        if not options["reuse"] and not 0 < options["polls"] <= MAX_QUICKPOLL:
+            raise CommandError(f"--polls must be between 1 and {MAX_QUICKPOLL}.")
+        self.base_url = options["url"]
+        if self.base_url:
+            self.run(options)
+            return
+        if not options["in_process"]:
+            raise CommandError(
+                "Without --url the load goes to the configured database and may replace "
+                "real quick polls. Pass --in-process to do it anyway (on a copy)."
+            )
+        # The test client calls itself "testserver", and pages must render
+        # whether or not static files were collected
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        ):
+            self.run(options)
+
+    def run(self, options):
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.failures = {name: {"errors": 0, "locked": 0, "throttled": 0} for name in ENDPOINTS}
+        self.lock = threading.Lock()
+        self.device_count = 0
+
+        if options["reuse"]:
+            polls = [self.reuse_poll(external_id) for external_id in options["reuse"]]
+        else:
+            polls = [self.create_poll(i, options) for i in range(options["polls"])]
+
+        self.deadline = time.monotonic() + options["duration"]
+        self.votes_left = options["votes"]
+        started = time.monotonic()
+        threads = [threading.Thread(target=self.voter, args=(polls,)) for _ in range(options["concurrency"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if not self.base_url and not options["reuse"] and not options["keep"]:
+            QuickPoll.objects.filter(external_id__in=[poll["external_id"] for poll in polls]).delete()
+        self.report(elapsed, options)
+
+    def new_device(self):
+        with self.lock:
+            self.device_count += 1
+            n = self.device_count
+        # Every device gets its own address, so per-IP rate limits see distinct voters
+        ip = f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+        return RemoteDevice(self.base_url, ip) if self.base_url else LocalDevice(ip)
+
+    def timed(self, device, endpoint, method, path, data=None):
+        started = time.perf_counter()
+        try:
+            status, location, body = device.request(method, path, data)
+        except Exception as e:
+            status, location, body = 500, "", str(e).encode()
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.samples[endpoint].append(elapsed)
+            failures = self.failures[endpoint]
+            if status == 429:
+                failures["throttled"] += 1
+            elif status >= 500:
+                failures["errors"] += 1
+                if LOCKED_RE.search(body.decode(errors="replace")):
+                    failures["locked"] += 1
+        return status, location, body
+
+    def create_poll(self, index, options):
+        device = self.new_device()
+        self.timed(device, "create", "GET", reverse("polls:quickpoll_create"))
+        status, location, _body = self.timed(device, "create", "POST", reverse("polls:quickpoll_create"), {
+            "question": f"Load test #{index + 1}",
+            "options_text": "\n".join(f"Option {i + 1}" for i in range(options["options"])),
+            "dead_line": (timezone.now() + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M"),
+            "max_participants": options["participants"],
+            **({"is_ticket_secured": "on"} if options["tickets"] else {}),
+        })
+        if status != 302:
+            raise CommandError(f"Could not create a poll (HTTP {status}).")
+        external_id = location.rstrip("/").rsplit("/", 1)[-1]
+        codes = []
+        if options["tickets"]:
+            status, _location, body = self.timed(
+                device, "tickets", "GET", reverse("polls:quickpoll_tickets_export", args=[external_id])
+            )
+            codes = body.decode().split()
+        return {"external_id": external_id, "tickets": codes}
+
+    def reuse_poll(self, external_id):
+        try:
+            model, pk = resolve_external_id(external_id)
+        except PollCode.DoesNotExist:
+            raise CommandError(f"Poll {external_id} not found.")
+        if model is not QuickPoll:
+            raise CommandError(f"{external_id} is not a quick poll.")
+        poll = QuickPoll.objects.get(pk=pk)
+        codes = list(poll.tickets.filter(is_used=False).values_list("code", flat=True))
+        return {"external_id": external_id, "tickets": codes}
+
+    def take_vote(self):
+        with self.lock:
+            if self.votes_left is None:
+                return True
+            if self.votes_left <= 0:
+                return False
+            self.votes_left -= 1
+            return True
+
+    def voter(self, polls):
+        try:
+            while time.monotonic() < self.deadline and self.take_vote():
+                poll = random.choice(polls)
+                external_id = poll["external_id"]
+                ticket = None
+                if poll["tickets"]:
+                    with self.lock:
+                        ticket = poll["tickets"].pop() if poll["tickets"] else None
+                    if ticket is None:
+                        break
+
+                device = self.new_device()
+                self.timed(device, "detail", "GET", reverse("polls:quickpoll_detail", args=[external_id]))
+                status, _location, body = self.timed(
+                    device, "vote_form", "GET", reverse("polls:quickpoll_vote", args=[external_id])
+                )
+                if status != 200:
+                    continue
+                ranks = list(range(1, len(RANK_FIELD_RE.findall(body.decode())) + 1))
+                random.shuffle(ranks)
+                data = {f"rank_{i}": rank for i, rank in enumerate(ranks)}
+                if ticket:
+                    data["ticket_code"] = ticket
+                self.timed(device, "vote", "POST", reverse("polls:quickpoll_vote", args=[external_id]), data)
+                self.timed(device, "results", "GET", reverse("polls:quickpoll_results", args=[external_id]))
+        finally:
+            if not self.base_url:
+                connections.close_all()
+
+    def report(self, elapsed, options):
+        mode = self.base_url or "in-process test client"
+        self.stdout.write(
+            f"{options['concurrency']} voters for {elapsed:.1f}s against {mode}"
+            f" ({'ticket-secured' if options['tickets'] else 'open'} polls)"
+        )
+        self.stdout.write(
+            f"{'endpoint':<10} {'count':>7} {'errors':>7} {'locked':>7} {'429':>7}"
+            f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for name in ENDPOINTS:
+            samples = sorted(self.samples[name])
+            if not samples:
+                continue
+            failures = self.failures[name]
+            self.stdout.write(
+                f"{name:<10} {len(samples):>7} {failures['errors']:>7} {failures['locked']:>7}"
+                f" {failures['throttled']:>7}"
+                + "".join(f" {percentile(samples, pct) * 1000:>8.1f}" for pct in (50, 95, 99))
+            )
+        votes = len(self.samples["vote"])
+        locked = sum(failures["locked"] for failures in self.failures.values())
+        total = sum(len(samples) for samples in self.samples.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{votes / elapsed:.1f} votes/s, 'database is locked' on "
+            f"{locked / total * 100 if total else 0:.2f}% of {total} requests."
+        ))
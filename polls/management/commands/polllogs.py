@@ -0,0 +1,159 @@
+import csv
+import json
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from polls.models import PollLog, PollCode, resolve_external_id
+
+CHUNK_SIZE = 2000
+# Polls whose code and question are remembered between chunks
+POLL_CACHE_SIZE = 10000
+FORMATS = ["text", "jsonl", "csv"]
+FIELDS = ["id", "timestamp", "action", "user", "ip", "poll", "poll_type", "object_id", "question"]
+
+
+def parse_when(value, end=False):
+    """
+    Aware datetime for an ISO date or datetime. A bare date means the start
+    of that day, or the start of the next one when `end` is set, so that
+    --until includes the whole day.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        moment = datetime.combine(day + timedelta(days=1 if end else 0), dt_time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints poll logs (visits and votes), oldest first, as text, JSON lines or CSV. "
+        "Rows are read in primary key order, CHUNK_SIZE at a time, so memory stays flat "
+        "on any number of rows. With --follow, keeps printing new rows as they arrive."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Only rows from this date or ISO datetime on")
+        parser.add_argument("--until", help="Only rows up to this date (included) or ISO datetime")
+        parser.add_argument("--action", choices=[code for code, _label in PollLog.ACTION_TYPES])
+        parser.add_argument("--poll", help="Only rows of this poll (external ID)")
+        parser.add_argument("--ip", help="Only rows from this IP address")
+        parser.add_argument("--tail", type=int, help="Start with the last N matching rows")
+        parser.add_argument("--follow", action="store_true", help="Wait for new rows (Ctrl-C to stop)")
+        parser.add_argument("--interval", type=float, default=2, help="Seconds between checks with --follow")
+        parser.add_argument("--format", choices=FORMATS, default="text")
+
+    def handle(self, *args, **options):
+        logs = self.filtered(options)
+        last_pk = 0
+        if options["tail"] is not None:
+            if options["tail"] <= 0:
+                raise CommandError("--tail must be positive.")
+            first = logs.order_by("-pk").values_list("pk", flat=True)[options["tail"] - 1:options["tail"]]
+            last_pk = first[0] - 1 if first else 0
+
+        self.polls = {}
+        self.write = {"text": self.write_text, "jsonl": self.write_jsonl, "csv": self.write_csv}[options["format"]]
+        if options["format"] == "csv":
+            self.csv = csv.writer(self.stdout, lineterminator="\n")
+            self.csv.writerow(FIELDS)
+
+        try:
+            while True:
+                chunk = list(
+                    logs.filter(pk__gt=last_pk).order_by("pk").values_list(
+                        "pk", "timestamp", "action_type", "user__username", "ip_address",
+                        "content_type_id", "object_id",
+                    )[:CHUNK_SIZE]
+                )
+                if chunk:
+                    self.load_polls(chunk)
+                    for row in chunk:
+                        self.write(row)
+                    last_pk = chunk[-1][0]
+                    self.stdout.flush()
+                if len(chunk) < CHUNK_SIZE:
+                    if not options["follow"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+    def filtered(self, options):
+        logs = PollLog.objects.all()
+        if options["since"]:
+            logs = logs.filter(timestamp__gte=parse_when(options["since"]))
+        if options["until"]:
+            logs = logs.filter(timestamp__lt=parse_when(options["until"], end=True))
+        if options["action"]:
+            logs = logs.filter(action_type=options["action"])
+        if options["ip"]:
+            logs = logs.filter(ip_address=options["ip"])
+        if options["poll"]:
+            try:
+                model, pk = resolve_external_id(options["poll"])
+            except PollCode.DoesNotExist:
+                raise CommandError(f"Poll {options['poll']} not found.")
+            logs = logs.filter(content_type=ContentType.objects.get_for_model(model), object_id=pk)
+        return logs
+
+    def load_polls(self, chunk):
+        """
+        Fetches the code and question of the chunk's polls not seen yet,
+        one query per poll model.
+        """
+        if len(self.polls) > POLL_CACHE_SIZE:
+            self.polls.clear()
+        missing = {}
+        for *_row, content_type_id, object_id in chunk:
+            if (content_type_id, object_id) not in self.polls:
+                missing.setdefault(content_type_id, set()).add(object_id)
+        for content_type_id, ids in missing.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            for pk, external_id, question in model.objects.filter(pk__in=ids).values_list("pk", "external_id", "question"):
+                self.polls[content_type_id, pk] = (model._meta.model_name, external_id, question)
+            for pk in ids:
+                # Deleted since the chunk was read
+                self.polls.setdefault((content_type_id, pk), (model._meta.model_name, None, None))
+
+    def record(self, row):
+        pk, timestamp, action, username, ip, content_type_id, object_id = row
+        poll_type, external_id, question = self.polls[content_type_id, object_id]
+        return {
+            "id": pk,
+            "timestamp": timezone.localtime(timestamp).isoformat(),
+            "action": action,
+            "user": username,
+            "ip": ip,
+            "poll": external_id,
+            "poll_type": poll_type,
+            "object_id": object_id,
+            "question": question,
+        }
+
+    def write_text(self, row):
+        record = self.record(row)
+        poll = f"{record['poll']} {record['question']}" if record["poll"] else "(deleted)"
+        self.stdout.write(
+            f"[{timezone.localtime(row[1]):%Y-%m-%d %H:%M:%S}] "
+            f"Action: {record['action']} | "
+            f"User: {record['user'] or 'Anonymous'} | "
+            f"IP: {record['ip'] or 'Unknown IP'} | "
+            f"Poll: {poll} (Type: {record['poll_type']}, ID: {record['object_id']})"
+        )
+
+    def write_jsonl(self, row):
+        self.stdout.write(json.dumps(self.record(row)))
+
+    def write_csv(self, row):
+        record = self.record(row)
+        self.csv.writerow([record[field] for field in FIELDS])
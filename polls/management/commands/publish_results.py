@@ -0,0 +1,23 @@
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand
+
+from polls import artifacts
+from polls.models import QuickPoll
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the pre-rendered results that nginx serves for finished quick polls "
+        "(see polls/artifacts.py). Polls already published are skipped, so it is "
+        "meant to run every minute."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", help="Host of the links in the pages (default: the current Site domain)")
+        parser.add_argument("--scheme", default="https", choices=["http", "https"])
+
+    def handle(self, *args, **options):
+        host = options["host"] or Site.objects.get_current().domain
+        for poll in QuickPoll.objects.finished():
+            if artifacts.publish(poll, host, options["scheme"]):
+                self.stdout.write(f"Published {poll.external_id}")
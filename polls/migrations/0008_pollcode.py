@@ -0,0 +1,47 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:18
+
+import random
+import string
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def register_existing_codes(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    PollCode = apps.get_model('polls', 'PollCode')
+    taken = set()
+    for model_name in ('quickpoll', 'housepoll'):
+        Model = apps.get_model('polls', model_name)
+        content_type, _ = ContentType.objects.get_or_create(app_label='polls', model=model_name)
+        codes = []
+        for poll in Model.objects.only('pk', 'external_id'):
+            code = poll.external_id
+            # Codes were only unique per table; re-draw the rare cross-kind duplicates
+            while code in taken:
+                code = ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(8))
+            if code != poll.external_id:
+                Model.objects.filter(pk=poll.pk).update(external_id=code)
+            taken.add(code)
+            codes.append(PollCode(code=code, content_type=content_type, object_id=poll.pk))
+        PollCode.objects.bulk_create(codes, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('polls', '0007_housepoll_created_at_quickpoll_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PollCode',
+            fields=[
+                ('code', models.CharField(max_length=8, primary_key=True, serialize=False)),
+                ('object_id', models.PositiveIntegerField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.RunPython(register_existing_codes, migrations.RunPython.noop),
+    ]
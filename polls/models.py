@@ -2,7 +2,8 @@ import uuid
 import random
 import string
 import json
-from django.db import models
+from functools import lru_cache
+from django.db import models, transaction, IntegrityError
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
@@ -10,6 +11,9 @@ from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelatio
 from django.contrib.contenttypes.models import ContentType
 from django.core.mail import send_mail
 from django.urls import reverse
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import ticket_filter
 
 # --- Utilities ---
 
@@ -18,6 +22,27 @@ def generate_ticket_code():
     chars = string.ascii_uppercase + string.digits
     return ''.join(random.choice(chars) for _ in range(8))
 
+def ranking_to_choices(options, ranking):
+    """
+    Turns an ordered list of options (best first) into the {option: rank}
+    mapping stored on ballots. Raises ValueError if it isn't a full ranking.
+    """
+    if not isinstance(ranking, list) or sorted(map(str, ranking)) != sorted(options):
+        raise ValueError("Ranking must list every option exactly once.")
+    return {option: rank for rank, option in enumerate(ranking, 1)}
+
+def validate_choices(options, choices):
+    """
+    Checks a {option: rank} mapping the way VoteForm does: every option
+    ranked, ranks between 1 and the number of options.
+    """
+    if not isinstance(choices, dict) or set(choices) != set(options):
+        raise ValueError("Every option must be ranked.")
+    for rank in choices.values():
+        if not isinstance(rank, int) or isinstance(rank, bool) or not 1 <= rank <= len(options):
+            raise ValueError("Ranks must be between 1 and %d." % len(options))
+    return choices
+
 # --- Supporting Models ---
 
 class Ticket(models.Model):
@@ -36,6 +61,12 @@ class Ticket(models.Model):
     def __str__(self):
         return f"Ticket {self.code} ({'Used' if self.is_used else 'Available'})"
 
+@receiver(post_save, sender=Ticket)
+def forget_ticket_filter(sender, instance, created, **kwargs):
+    # The cached codes would reject the new ticket
+    if created:
+        ticket_filter.forget(instance.content_type_id, instance.object_id)
+
 class Ballot(models.Model):
     """
     Stores a single vote.
@@ -77,8 +108,60 @@ class PollLog(models.Model):
     def __str__(self):
         return f"{self.action_type} on {self.poll} at {self.timestamp}"
 
+class PollCode(models.Model):
+    """
+    Registry of every poll external_id, whatever the poll kind.
+    Makes codes unique across HousePoll and QuickPoll and lets a code be
+    resolved with a single primary-key lookup.
+    """
+    code = models.CharField(max_length=8, primary_key=True)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    poll = GenericForeignKey('content_type', 'object_id')
+
+    def __str__(self):
+        return f"{self.code} -> {self.content_type.model} {self.object_id}"
+
+@lru_cache(maxsize=2048)
+def resolve_external_id(code):
+    """
+    Returns (poll model, pk) for an external_id.
+    Raises PollCode.DoesNotExist for unknown codes, which keeps misses out of
+    the LRU so a code can't be cached as missing before its poll exists.
+    """
+    content_type_id, object_id = PollCode.objects.values_list(
+        'content_type_id', 'object_id'
+    ).get(code=code)
+    return ContentType.objects.get_for_id(content_type_id).model_class(), object_id
+
+@receiver(post_delete, sender=PollCode)
+def forget_external_id(sender, instance, **kwargs):
+    resolve_external_id.cache_clear()
+
 # --- Abstract Base Poll ---
 
+class PollQuerySet(models.QuerySet):
+    """
+    Database-side equivalents of Poll.is_finished, so listings don't
+    need one COUNT query per poll.
+    """
+    def with_ballot_count(self):
+        if 'ballot_count' in self.query.annotations:
+            return self
+        return self.annotate(ballot_count=models.Count('ballots'))
+
+    def finished(self):
+        return self.with_ballot_count().filter(
+            models.Q(dead_line__lt=timezone.now())
+            | models.Q(ballot_count__gte=models.F('max_participants'))
+        )
+
+    def active(self):
+        return self.with_ballot_count().filter(
+            dead_line__gte=timezone.now(),
+            ballot_count__lt=models.F('max_participants'),
+        )
+
 class Poll(models.Model):
     # All poll and quickpoll are identified by a random and unic 8 char long ID
     external_id = models.CharField(max_length=8, default=generate_ticket_code, unique=True, editable=False)
@@ -94,6 +177,9 @@ class Poll(models.Model):
     tickets = GenericRelation(Ticket)
     ballots = GenericRelation(Ballot)
     logs = GenericRelation(PollLog)
+    codes = GenericRelation(PollCode)
+
+    objects = PollQuerySet.as_manager()
 
     def log_action(self, action_type, user=None, ip_address=None):
         """
@@ -106,19 +192,52 @@ class Poll(models.Model):
             ip_address=ip_address
         )
 
+    async def alog_action(self, action_type, user=None, ip_address=None):
+        """
+        Async counterpart of log_action, for the async views.
+        """
+        await PollLog.objects.acreate(
+            poll=self,
+            action_type=action_type,
+            user=user if user and user.is_authenticated else None,
+            ip_address=ip_address
+        )
+
     class Meta:
         abstract = True
 
     def save(self, *args, **kwargs):
-        if self.pk is None and not self.ballot_count_time:
+        if self.pk is not None:
+            super().save(*args, **kwargs)
+            return
+
+        if not self.ballot_count_time:
             self.ballot_count_time = self.dead_line
-        super().save(*args, **kwargs)
+
+        # Claim the external_id in the registry together with the poll row;
+        # on a collision with any other poll, draw a new code and retry.
+        content_type = ContentType.objects.get_for_model(self)
+        for attempt in range(5):
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                    PollCode.objects.create(code=self.external_id, content_type=content_type, object_id=self.pk)
+                return
+            except IntegrityError:
+                if attempt == 4:
+                    raise
+                self.pk = None
+                self._state.adding = True
+                self.external_id = generate_ticket_code()
 
     @property
     def is_finished(self):
         """Poll is finished if deadline passed OR max participants reached."""
         now = timezone.now()
-        count = self.ballots.count()
+        # Reuse the count when the poll comes from PollQuerySet.with_ballot_count()
+        count = getattr(self, 'ballot_count', None)
+        if count is None:
+            count = self.ballots.count()
         return now > self.dead_line or count >= self.max_participants
 
     def generate_tickets(self):
@@ -131,8 +250,13 @@ class Poll(models.Model):
         current_count = self.tickets.count()
         needed = self.max_participants - current_count
         
-        for _ in range(needed):
-            Ticket.objects.create(poll=self)
+        # bulk_create sends no post_save, so the filter is rebuilt once at the end
+        content_type = ContentType.objects.get_for_model(self)
+        Ticket.objects.bulk_create(
+            (Ticket(content_type=content_type, object_id=self.pk) for _ in range(needed)),
+            batch_size=1000,
+        )
+        ticket_filter.build(self)
 
     def save_ballot(self, choices, user=None, ticket_code=None, ip_address=None):
         """
@@ -142,18 +266,12 @@ class Poll(models.Model):
         if self.is_finished:
             raise ValueError("Poll is closed.")
 
-        ticket_obj = None
-
         if self.is_ticket_secured:
             if not ticket_code:
                 raise ValueError("Ticket required.")
-            try:
-                ticket_obj = self.tickets.get(code=ticket_code, is_used=False)
-            except Ticket.DoesNotExist:
+            # Wrong and guessed codes stop here, without a query
+            if not ticket_filter.may_be_unused(self, ticket_code):
                 raise ValueError("Invalid or used ticket.")
-            
-            ticket_obj.is_used = True
-            ticket_obj.save()
         else:
             # If not secured, user must be logged in and unique only for HousePoll
             if hasattr(self, 'house'):
@@ -170,34 +288,104 @@ class Poll(models.Model):
         # Ensure we don't pass an unauthenticated User object to the voter ForeignKey
         real_voter = user if (user and user.is_authenticated and not self.is_ticket_secured) else None
 
-        ballot = Ballot.objects.create(
-            poll=self,
-            choices=choices,
-            ticket=ticket_obj,
-            voter=real_voter
-        )
-        self.ballot_count_time = timezone.now()
-        self.save()
-        self.log_action('VOTE', user=user, ip_address=ip_address)
+        with transaction.atomic():
+            ticket_obj = None
+            if self.is_ticket_secured:
+                try:
+                    ticket_obj = self.tickets.get(code=ticket_code, is_used=False)
+                except Ticket.DoesNotExist:
+                    raise ValueError("Invalid or used ticket.")
+                # Conditional claim: of two concurrent votes with the same
+                # ticket, only the first one to commit updates a row
+                if not Ticket.objects.filter(pk=ticket_obj.pk, is_used=False).update(is_used=True):
+                    raise ValueError("Invalid or used ticket.")
+                ticket_obj.is_used = True
+                transaction.on_commit(lambda: ticket_filter.discard(self, [ticket_code]))
+
+            ballot = Ballot.objects.create(
+                poll=self,
+                choices=choices,
+                ticket=ticket_obj,
+                voter=real_voter
+            )
+            self.ballot_count_time = timezone.now()
+            self.save()
+            self.log_action('VOTE', user=user, ip_address=ip_address)
         return ballot
 
+    def import_ballots(self, entries, batch_size=1000):
+        """
+        Saves many offline (paper) ballots at once.
+        `entries` is a list of (choices, ticket_code) pairs. Everything is
+        validated before anything is written, tickets are claimed with one
+        UPDATE per batch and ballots are bulk inserted. Raises ValueError on
+        the first problem; returns the number of ballots created.
+        """
+        if self.is_finished:
+            raise ValueError("Poll is closed.")
+        if hasattr(self, 'house') and not self.is_ticket_secured:
+            raise ValueError("This poll only accepts votes from logged-in members.")
+        if self.ballots.count() + len(entries) > self.max_participants:
+            raise ValueError("More ballots than the poll allows.")
+
+        for line, (choices, ticket_code) in enumerate(entries, 1):
+            try:
+                validate_choices(self.options, choices)
+            except ValueError as e:
+                raise ValueError(f"Ballot {line}: {e}")
+
+        ticket_ids = [None] * len(entries)
+        if self.is_ticket_secured:
+            codes = [ticket_code for _choices, ticket_code in entries]
+            if not all(codes):
+                raise ValueError("Ticket required.")
+            if len(set(codes)) != len(codes):
+                raise ValueError("A ticket is used more than once.")
+            # One cache read for the whole import
+            numbers = ticket_filter.load(self)
+            invalid = [code for code in codes if not ticket_filter.contains_code(numbers, code)]
+            if invalid:
+                raise ValueError("Invalid or used ticket: %s" % ', '.join(invalid[:10]))
+            available = {}
+            for start in range(0, len(codes), batch_size):
+                available.update(self.tickets.filter(
+                    code__in=codes[start:start + batch_size], is_used=False
+                ).values_list('code', 'pk'))
+            invalid = [code for code in codes if code not in available]
+            if invalid:
+                raise ValueError("Invalid or used ticket: %s" % ', '.join(invalid[:10]))
+            ticket_ids = [available[code] for code in codes]
+
+        content_type = ContentType.objects.get_for_model(self)
+        with transaction.atomic():
+            if self.is_ticket_secured:
+                for start in range(0, len(ticket_ids), batch_size):
+                    chunk = ticket_ids[start:start + batch_size]
+                    if Ticket.objects.filter(pk__in=chunk, is_used=False).update(is_used=True) != len(chunk):
+                        raise ValueError("Tickets were used while importing.")
+                transaction.on_commit(lambda: ticket_filter.discard(self, codes))
+            Ballot.objects.bulk_create(
+                (
+                    Ballot(content_type=content_type, object_id=self.pk, choices=choices, ticket_id=ticket_id)
+                    for (choices, _code), ticket_id in zip(entries, ticket_ids)
+                ),
+                batch_size=batch_size,
+            )
+            # One counter update for the whole import; it also invalidates cached tallies
+            self.ballot_count_time = timezone.now()
+            self.save(update_fields=['ballot_count_time'])
+        return len(entries)
+
     def get_results_json(self):
         """
         Returns JSON format for verification:
-        {{ticket/None: choices...}, ...}
+        {{ticket/Anonymous-<ballot id>: choices...}, ...}
         """
         if not self.is_finished:
             return None # Or raise error
-            
-        results = {}
-        for ballot in self.ballots.all():
-            if ballot.ticket:
-               key = ballot.ticket.code
-            else:
-                # Use the ballot's primary key to ensure uniqueness while remaining anonymous
-               key = f"Anonymous"
-            results[key] = ballot.choices
-        return json.dumps(results, indent=2)
+
+        from .exports import iter_export
+        return ''.join(iter_export(self, 'json'))
 
     # --- Concrete Poll Implementations ---
 
@@ -217,6 +405,8 @@ class HousePoll(Poll):
         (POLL_TYPE_DELETION, _('House Deletion')),
     ]
 
+    detail_url_name = 'polls:house_poll_detail'
+
     house = models.ForeignKey('houses.House', on_delete=models.CASCADE, related_name='polls')
     creator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     poll_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default=POLL_TYPE_STANDARD)
@@ -251,6 +441,8 @@ class QuickPoll(Poll):
     """
     A standalone poll accessible via ID.
     """
+    detail_url_name = 'polls:quickpoll_detail'
+
     # Optional owner, but not required
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
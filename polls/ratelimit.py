@@ -0,0 +1,124 @@
+"""
+Admission control for the vote, join and ticket endpoints.
+
+Each scope in settings.RATELIMITS lists one or more buckets:
+
+    'vote': [
+        (('ip', 'poll', 'user'), 10, 1 / 6),  # key parts, burst, requests per second
+        (('ip',), 120, 2),
+    ]
+
+A bucket lets `burst` requests through per window of burst / rate seconds;
+a request counts in every bucket of its scope and is answered with 429 as
+soon as one of them is full. Key parts only use what the client can't
+choose:
+
+    ip    get_client_ip(), the address nginx saw
+    poll  the external_id URL argument
+    user  the id of the logged-in user, '-' for anonymous visitors
+
+Cookies are deliberately not used, a script would just drop them.
+
+Counters live in the "ratelimit" cache and are updated with add() and
+incr(), which are atomic on Redis. Without Redis that cache is in memory
+and each worker process counts on its own. The check runs in a worker thread
+when the view is async, since reading the user may hit the session store.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+from django.utils.translation import gettext as _
+
+
+def request_key(request, parts, view_kwargs):
+    from .views import get_client_ip
+
+    values = []
+    for part in parts:
+        if part == 'ip':
+            values.append(get_client_ip(request) or '-')
+        elif part == 'poll':
+            values.append(view_kwargs.get('external_id', '-'))
+        elif part == 'user':
+            user = getattr(request, 'user', None)
+            values.append(str(user.pk) if user is not None and user.is_authenticated else '-')
+        else:
+            raise ValueError(f"Unknown rate limit key part: {part}")
+    return ':'.join(values)
+
+
+def take_token(key, burst, rate):
+    """
+    Counts a request in the current window of the bucket `key`. Returns 0
+    while the window holds at most `burst` requests, otherwise the number
+    of seconds until the next window.
+    """
+    cache = caches['ratelimit']
+    window = burst / rate
+    now = time.time()
+    index = int(now // window)
+    key = f"{key}:{index}"
+    timeout = math.ceil(window) + 1
+    if cache.add(key, 1, timeout):
+        count = 1
+    else:
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(key, 1, timeout)
+            count = 1
+    if count <= burst:
+        return 0
+    return (index + 1) * window - now
+
+
+def check(scope, request, view_kwargs):
+    """
+    Returns a 429 response when `request` is over the limits of `scope`,
+    None otherwise.
+    """
+    if not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return None
+    wait = 0
+    for index, (parts, burst, rate) in enumerate(settings.RATELIMITS.get(scope, ())):
+        client = hashlib.md5(request_key(request, parts, view_kwargs).encode()).hexdigest()
+        key = f"ratelimit:{scope}:{index}:{client}"
+        wait = max(wait, take_token(key, burst, rate))
+    if not wait:
+        return None
+
+    message = _("Too many requests, please try again later.")
+    if request.content_type == 'application/json':
+        response = JsonResponse({'error': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def ratelimit(scope, methods=None):
+    """
+    View decorator applying the buckets of `scope` to requests made with
+    one of `methods` (all methods by default). Works on sync and async views.
+    """
+    def decorator(view):
+        def limited(request, kwargs):
+            if methods and request.method not in methods:
+                return None
+            return check(scope, request, kwargs)
+
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                return await sync_to_async(limited)(request, kwargs) or await view(request, *args, **kwargs)
+        else:
+            def wrapper(request, *args, **kwargs):
+                return limited(request, kwargs) or view(request, *args, **kwargs)
+        return wraps(view)(wrapper)
+    return decorator
@@ -0,0 +1,87 @@
+import json
+import time
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from polls.models import QuickPoll
+from django.utils import timezone
+from datetime import timedelta
+
+# Documented target for poll_vote_api; the test asserts a third of it so
+# slow CI machines don't flake.
+TARGET_VOTES_PER_SECOND = 250
+
+class VoteApiTest(TestCase):
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B', 'C'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=1000,
+        )
+        self.url = reverse('polls:poll_vote_api', kwargs={'external_id': self.poll.external_id})
+        self.client = Client(enforce_csrf_checks=True)
+
+    def vote(self, payload):
+        # Every vote from a new device
+        self.client.cookies.pop('quickpolls_voted', None)
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_vote_returns_receipt(self):
+        response = self.vote({'ranking': ['B', 'A', 'C']})
+        self.assertEqual(response.status_code, 201)
+        receipt = response.json()
+        self.assertEqual(receipt['poll'], self.poll.external_id)
+        self.assertTrue(receipt['receipt'].startswith('Anonymous-'))
+        self.assertEqual(self.poll.ballots.get().choices, {'B': 1, 'A': 2, 'C': 3})
+
+    def test_ballot_count_comes_with_the_poll(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.vote({'ranking': ['A', 'B', 'C']}).status_code, 201)
+        counts = [q['sql'] for q in queries if q['sql'].startswith('SELECT COUNT(*)')]
+        self.assertEqual(counts, [])
+
+    def test_ticket_vote(self):
+        poll = QuickPoll.objects.create(
+            question='Secured?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=1,
+            is_ticket_secured=True,
+        )
+        code = poll.tickets.get().code
+        url = reverse('polls:poll_vote_api', kwargs={'external_id': poll.external_id})
+        response = self.client.post(url, json.dumps({'ranking': ['A', 'B'], 'ticket': code}), content_type='application/json')
+        self.assertEqual(response.json()['receipt'], code)
+        response = self.client.post(url, json.dumps({'ranking': ['A', 'B'], 'ticket': code}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_one_vote_per_device_on_open_polls(self):
+        self.assertEqual(self.vote({'ranking': ['A', 'B', 'C']}).status_code, 201)
+        response = self.client.post(self.url, json.dumps({'ranking': ['A', 'B', 'C']}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.poll.ballots.count(), 1)
+
+    def test_invalid_payloads(self):
+        for payload in ({'ranking': ['A', 'B']}, {'ranking': ['A', 'A', 'B']}, {'ranking': 'A,B,C'},
+                        {'ranking': ['A', 'B', 'C'], 'extra': 1}, ['A', 'B', 'C']):
+            self.assertEqual(self.vote(payload).status_code, 400, payload)
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.poll.ballots.count(), 0)
+
+    def test_unknown_poll(self):
+        url = reverse('polls:poll_vote_api', kwargs={'external_id': 'NOPE0000'})
+        self.assertEqual(self.client.post(url, '{}', content_type='application/json').status_code, 404)
+
+    # Measures the handler itself, one client would be throttled long before 200 votes
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_throughput(self):
+        votes = 200
+        started = time.perf_counter()
+        for _ in range(votes):
+            self.vote({'ranking': ['A', 'B', 'C']})
+        rate = votes / (time.perf_counter() - started)
+        self.assertEqual(self.poll.ballots.count(), votes)
+        self.assertGreater(rate, TARGET_VOTES_PER_SECOND / 3)
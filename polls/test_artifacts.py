@@ -0,0 +1,79 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from polls.models import QuickPoll, Ballot
+from polls import artifacts
+from django.utils import timezone
+from datetime import timedelta
+
+class ResultsArtifactsTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() - timedelta(minutes=1),
+            max_participants=10,
+        )
+        for choices in ({'A': 1, 'B': 2}, {'A': 1, 'B': 2}, {'A': 2, 'B': 1}):
+            Ballot.objects.create(poll=self.poll, choices=choices)
+        self.directory = artifacts.poll_directory(self.poll.external_id)
+
+    def url(self, name):
+        return reverse(name, kwargs={'external_id': self.poll.external_id})
+
+    def publish(self):
+        out = StringIO()
+        call_command('publish_results', host='testserver', scheme='http', stdout=out)
+        return out.getvalue()
+
+    def test_command_publishes_finished_polls(self):
+        self.assertFalse(self.directory.exists())
+        self.assertEqual(self.publish(), f'Published {self.poll.external_id}\n')
+
+        for language, _name in settings.LANGUAGES:
+            html = (self.directory / f'{language}.html').read_text()
+            self.assertIn(f'<html lang="{language}">', html)
+            self.assertIn('Quick Poll Question?', html)
+            self.assertIn('js/prerendered.js', html)
+            self.assertIn(f'/{language}/polls/quickpoll/{self.poll.external_id}/results/', html)
+
+        client = Client()
+        export = b''.join(client.get(self.url('polls:quickpoll_export')).streaming_content)
+        self.assertEqual((self.directory / 'export.json').read_bytes(), export)
+        digest = client.get(self.url('polls:quickpoll_export') + '?format=digest').content
+        self.assertEqual((self.directory / 'digest.json').read_bytes(), digest)
+        self.assertEqual(json.loads(digest)['ballot_count'], 3)
+
+    def test_results_view_does_not_publish(self):
+        response = Client().get(self.url('polls:quickpoll_results'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.directory.exists())
+
+    def test_running_poll_is_not_published(self):
+        self.poll.dead_line = timezone.now() + timedelta(days=1)
+        self.poll.save()
+        self.assertEqual(self.publish(), '')
+        self.assertFalse(self.directory.exists())
+
+    def test_published_once(self):
+        self.publish()
+        self.assertEqual(self.publish(), '')
+        poll = QuickPoll.objects.with_ballot_count().get(pk=self.poll.pk)
+        self.assertFalse(artifacts.publish(poll, 'testserver'))
+
+    def test_removed_with_poll(self):
+        self.publish()
+        self.assertTrue(artifacts.is_published(self.poll))
+        self.poll.delete()
+        self.assertFalse(self.directory.exists())
@@ -0,0 +1,60 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase, AsyncClient
+from django.urls import reverse
+from polls.models import QuickPoll, Ballot
+from django.utils import timezone
+from datetime import timedelta
+
+class AsyncViewsTest(TestCase):
+    """
+    Runs the poll views through the ASGI handler, the way they are served
+    in production.
+    """
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B', 'C'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=3,
+        )
+        self.client = AsyncClient()
+
+    def url(self, name):
+        return reverse(name, kwargs={'external_id': self.poll.external_id})
+
+    async def test_vote_then_results(self):
+        response = await self.client.get(self.url('polls:quickpoll_detail'))
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.client.post(self.url('polls:quickpoll_vote'), {'rank_0': 2, 'rank_1': 1, 'rank_2': 3})
+        self.assertRedirects(response, self.url('polls:quickpoll_results'), fetch_redirect_response=False)
+        ballot = await Ballot.objects.aget(object_id=self.poll.pk)
+        self.assertEqual(ballot.choices, {'A': 2, 'B': 1, 'C': 3})
+
+        # The device cookie remembers the vote
+        response = await self.client.get(self.url('polls:quickpoll_vote'))
+        self.assertRedirects(response, self.url('polls:quickpoll_detail'), fetch_redirect_response=False)
+
+        response = await self.client.get(self.url('polls:quickpoll_results'))
+        self.assertEqual(response.status_code, 200)
+
+    async def test_finished_results_are_tallied(self):
+        await Ballot.objects.acreate(poll=self.poll, choices={'A': 1, 'B': 2, 'C': 3})
+        self.poll.dead_line = timezone.now() - timedelta(minutes=1)
+        await sync_to_async(self.poll.save)()
+
+        response = await self.client.get(self.url('polls:quickpoll_results'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['condorcet_stats']['winners'], ['A'])
+
+    async def test_join(self):
+        response = await self.client.post(reverse('polls:poll_join'), {'poll_id': self.poll.external_id})
+        self.assertRedirects(response, self.url('polls:quickpoll_detail'), fetch_redirect_response=False)
+
+    async def test_export_streams_asynchronously(self):
+        for i in range(3):
+            await Ballot.objects.acreate(poll=self.poll, choices={'A': 1, 'B': 2, 'C': 3})
+        response = await self.client.get(self.url('polls:quickpoll_export') + '?format=ndjson')
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(b''.join(lines).count(b'\n'), 3)
@@ -0,0 +1,38 @@
+import shutil
+import tempfile
+from io import StringIO
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+class BootstrapCommandTest(TestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        override = override_settings(STATIC_ROOT=self.static_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('bootstrap', '--domain', 'polls.example.org', '--name', 'Example', *args, stdout=out)
+        return {line.split()[0]: line for line in out.getvalue().splitlines()}
+
+    def test_second_run_skips_everything(self):
+        steps = self.run_command()
+        # The test database is fully migrated already
+        self.assertIn('skipped', steps['migrate'])
+        self.assertIn('collected', steps['collectstatic'])
+        self.assertIn('updated', steps['site'])
+        site = Site.objects.get()
+        self.assertEqual((site.domain, site.name), ('polls.example.org', 'Example'))
+
+        steps = self.run_command()
+        self.assertIn('skipped', steps['collectstatic'])
+        self.assertIn('skipped', steps['site'])
+        self.assertIn('collected', self.run_command('--force-static')['collectstatic'])
+
+    def test_site_is_created_when_missing(self):
+        Site.objects.all().delete()
+        self.assertIn('created', self.run_command()['site'])
+        self.assertEqual(Site.objects.get().domain, 'polls.example.org')
@@ -0,0 +1,62 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.test import TestCase, AsyncClient
+from django.urls import reverse
+from polls.models import QuickPoll
+from polls.events import broadcaster
+from django.utils import timezone
+from datetime import timedelta
+
+def parse(message):
+    event, data = message.strip().split('\n')
+    return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+class PollEventsTest(TestCase):
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=2,
+        )
+
+    async def next_event(self, stream):
+        return parse(await asyncio.wait_for(anext(stream), 5))
+
+    async def test_stream_follows_ballots_until_closed(self):
+        poll = await QuickPoll.objects.with_ballot_count().aget(pk=self.poll.pk)
+        stream = broadcaster.stream(poll)
+        self.assertEqual(await self.next_event(stream), ('count', {'ballot_count': 0, 'finished': False}))
+
+        await sync_to_async(poll.save_ballot)(choices={'A': 1, 'B': 2})
+        broadcaster.notify(poll)
+        self.assertEqual(await self.next_event(stream), ('count', {'ballot_count': 1, 'finished': False}))
+
+        await sync_to_async(poll.save_ballot)(choices={'A': 2, 'B': 1})
+        broadcaster.notify(poll)
+        self.assertEqual(await self.next_event(stream), ('closed', {'ballot_count': 2, 'finished': True}))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    async def test_listeners_share_one_watcher(self):
+        poll = await QuickPoll.objects.with_ballot_count().aget(pk=self.poll.pk)
+        streams = [broadcaster.stream(poll) for _ in range(3)]
+        for stream in streams:
+            await self.next_event(stream)
+        self.assertEqual(len(broadcaster.watchers), 1)
+        for stream in streams:
+            await stream.aclose()
+        self.assertNotIn((QuickPoll, poll.pk), broadcaster.listeners)
+
+    async def test_endpoint(self):
+        client = AsyncClient()
+        response = await client.get(reverse('polls:poll_events', kwargs={'external_id': 'NOPE1234'}))
+        self.assertEqual(response.status_code, 404)
+
+        self.poll.dead_line = timezone.now() - timedelta(minutes=1)
+        await sync_to_async(self.poll.save)()
+        response = await client.get(reverse('polls:poll_events', kwargs={'external_id': self.poll.external_id}))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(parse(content), ('closed', {'ballot_count': 0, 'finished': True}))
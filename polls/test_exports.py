@@ -0,0 +1,123 @@
+import csv
+import gzip
+import io
+import json
+from django.test import TestCase, Client
+from django.urls import reverse
+from polls.models import QuickPoll, Ticket
+from django.utils import timezone
+from datetime import timedelta
+
+class StreamingExportTest(TestCase):
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=3,
+        )
+        self.poll.save_ballot(choices={'A': 1, 'B': 2})
+        self.poll.save_ballot(choices={'A': 2, 'B': 1})
+        self.poll.save_ballot(choices={'A': 1, 'B': 2})
+        self.url = reverse('polls:quickpoll_export', kwargs={'external_id': self.poll.external_id})
+        self.client = Client()
+
+    def get_content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_json_keeps_every_anonymous_ballot(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        content = self.get_content(response)
+        results = json.loads(content)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(key.startswith('Anonymous-') for key in results))
+        self.assertEqual(content, json.dumps(results, indent=2))
+        self.assertEqual(self.poll.get_results_json(), content)
+
+    def test_ticket_code_is_the_key(self):
+        poll = QuickPoll.objects.create(
+            question='Secured?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=1,
+            is_ticket_secured=True,
+        )
+        code = poll.tickets.get().code
+        poll.save_ballot(choices={'A': 1, 'B': 2}, ticket_code=code)
+        self.assertEqual(json.loads(poll.get_results_json()), {code: {'A': 1, 'B': 2}})
+
+    def test_ndjson(self):
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in self.get_content(response).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[1]['choices'], {'A': 2, 'B': 1})
+
+    def test_csv(self):
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertIn('results.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(self.get_content(response))))
+        self.assertEqual(rows[0], ['key', 'timestamp', 'A', 'B'])
+        self.assertEqual([row[2:] for row in rows[1:]], [['1', '2'], ['2', '1'], ['1', '2']])
+
+    def test_gzip_when_accepted(self):
+        response = self.client.get(self.url, {'format': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(len(content.splitlines()), 3)
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+class IncrementalExportTest(TestCase):
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=5,
+        )
+        for ranks in ((1, 2), (2, 1), (1, 2), (1, 2), (2, 1)):
+            self.poll.save_ballot(choices=dict(zip(['A', 'B'], ranks)))
+        self.url = reverse('polls:quickpoll_export', kwargs={'external_id': self.poll.external_id})
+        self.client = Client()
+
+    def fetch(self, **params):
+        response = self.client.get(self.url, {'format': 'ndjson', **params})
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        return lines, response['X-Next-Cursor']
+
+    def test_paging_with_cursor(self):
+        mirrored = []
+        cursor = '0'
+        while True:
+            lines, next_cursor = self.fetch(since=cursor, limit=2)
+            if not lines:
+                self.assertEqual(next_cursor, cursor)
+                break
+            mirrored += lines
+            cursor = next_cursor
+        self.assertEqual(len(mirrored), 5)
+        self.assertEqual(len({line['key'] for line in mirrored}), 5)
+
+    def test_since_timestamp(self):
+        lines, _ = self.fetch()
+        lines_after, _ = self.fetch(since=lines[2]['timestamp'])
+        self.assertLessEqual(len(lines_after), 2)
+        self.assertEqual(self.client.get(self.url, {'since': 'not-a-date'}).status_code, 400)
+
+    def test_digest_matches_local_tally(self):
+        from polls.exports import matrix_digest
+        lines, cursor = self.fetch()
+        matrix = {'A': {'A': 0, 'B': 0}, 'B': {'A': 0, 'B': 0}}
+        for line in lines:
+            winner, loser = sorted(line['choices'], key=line['choices'].get)
+            matrix[winner][loser] += 1
+
+        digest = self.client.get(self.url, {'format': 'digest'}).json()
+        self.assertEqual(digest['ballot_count'], 5)
+        self.assertEqual(digest['last_cursor'], cursor)
+        self.assertEqual(digest['matrix_digest'], matrix_digest(matrix))
@@ -0,0 +1,65 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from polls.models import QuickPoll, Ballot
+from django.utils import timezone
+from datetime import timedelta
+
+User = get_user_model()
+
+class ConditionalRequestTest(TestCase):
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=2,
+        )
+        self.results_url = reverse('polls:quickpoll_results', kwargs={'external_id': self.poll.external_id})
+        self.export_url = reverse('polls:quickpoll_export', kwargs={'external_id': self.poll.external_id})
+        self.client = Client()
+
+    def finish_poll(self):
+        self.poll.save_ballot(choices={'A': 1, 'B': 2})
+        self.poll.save_ballot(choices={'A': 2, 'B': 1})
+
+    def test_results_revalidate_while_active(self):
+        response = self.client.get(self.results_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        # The "still in progress" message was consumed by the first render
+        response = self.client.get(self.results_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.poll.save_ballot(choices={'A': 1, 'B': 2})
+        response = self.client.get(self.results_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_finished_results_are_cached_longer(self):
+        self.finish_poll()
+        response = self.client.get(self.results_url)
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        response = self.client.get(self.results_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_results_vary_per_user(self):
+        self.finish_poll()
+        etag = self.client.get(self.results_url)['ETag']
+        User.objects.create_user(username='testuser', password='password')
+        self.client.login(username='testuser', password='password')
+        response = self.client.get(self.results_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_export_not_modified(self):
+        self.finish_poll()
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        response = self.client.get(self.export_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
@@ -0,0 +1,63 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from polls.models import QuickPoll, Ballot
+from django.utils import timezone
+from datetime import timedelta
+
+class ImportBallotsTest(TestCase):
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Paper ballots?',
+            options=['A', 'B', 'C'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=50,
+            is_ticket_secured=True,
+        )
+        self.codes = list(self.poll.tickets.values_list('code', flat=True))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmp.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def test_csv_import(self):
+        rows = ['ticket,A,B,C'] + [f'{code},1,2,3' for code in self.codes[:20]]
+        path = self.write('ballots.csv', '\n'.join(rows))
+        before = self.poll.ballot_count_time
+        out = StringIO()
+        with self.assertNumQueries(10):
+            call_command('import_ballots', self.poll.external_id, path, stdout=out)
+        self.assertIn(f'Imported 20 ballots into {self.poll.external_id}', out.getvalue())
+        self.assertEqual(self.poll.ballots.count(), 20)
+        self.assertEqual(self.poll.tickets.filter(is_used=True).count(), 20)
+        self.poll.refresh_from_db()
+        self.assertNotEqual(self.poll.ballot_count_time, before)
+
+    def test_ndjson_import(self):
+        lines = [json.dumps({'ranking': ['C', 'A', 'B'], 'ticket': code}) for code in self.codes[:3]]
+        path = self.write('ballots.ndjson', '\n'.join(lines))
+        out = StringIO()
+        call_command('import_ballots', self.poll.external_id, path, stdout=out)
+        self.assertIn(f'Imported 3 ballots into {self.poll.external_id}', out.getvalue())
+        self.assertEqual(
+            list(self.poll.ballots.values_list('choices', flat=True)),
+            [{'C': 1, 'A': 2, 'B': 3}] * 3,
+        )
+
+    def test_bad_file_imports_nothing(self):
+        rows = ['ticket,A,B,C', f'{self.codes[0]},1,2,3', 'NOTATICK,1,2,3']
+        path = self.write('ballots.csv', '\n'.join(rows))
+        with self.assertRaisesMessage(CommandError, 'NOTATICK'):
+            call_command('import_ballots', self.poll.external_id, path)
+        rows = ['ticket,A,B,C', f'{self.codes[0]},1,2,9']
+        path = self.write('ranks.csv', '\n'.join(rows))
+        with self.assertRaisesMessage(CommandError, 'Ballot 1'):
+            call_command('import_ballots', self.poll.external_id, path)
+        self.assertEqual(Ballot.objects.count(), 0)
+        self.assertFalse(self.poll.tickets.filter(is_used=True).exists())
@@ -0,0 +1,42 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase
+from condorcet_backend.dbhooks import LOCKED_RE
+from polls.models import QuickPoll
+from polls.management.commands.loadtest import percentile
+
+class LoadTestCommandTest(TransactionTestCase):
+    def run_command(self, *args):
+        out = StringIO()
+        # One voter at a time: the in-memory test database answers concurrent
+        # writes with "database table is locked" instead of waiting
+        call_command('loadtest', '--in-process', '--concurrency', '1', '--votes', '6', *args, stdout=out)
+        return out.getvalue()
+
+    def test_open_polls(self):
+        output = self.run_command('--polls', '2')
+        self.assertIn('p95 ms', output)
+        vote_line = next(line for line in output.splitlines() if line.startswith('vote '))
+        self.assertEqual(vote_line.split()[1:3], ['6', '0'])
+        # Synthetic polls are removed afterwards
+        self.assertFalse(QuickPoll.objects.exists())
+
+    def test_ticket_secured_polls(self):
+        self.run_command('--tickets', '--participants', '10', '--keep')
+        poll = QuickPoll.objects.get()
+        self.assertEqual(poll.ballots.count(), 6)
+        self.assertEqual(poll.tickets.filter(is_used=True).count(), 6)
+
+    def test_configured_database_needs_confirmation(self):
+        with self.assertRaisesMessage(CommandError, '--in-process'):
+            call_command('loadtest', '--votes', '1', stdout=StringIO())
+
+    def test_locked_table_is_reported(self):
+        self.assertTrue(LOCKED_RE.search('database table is locked: polls_ballot'))
+        self.assertTrue(LOCKED_RE.search('database is locked'))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([percentile(values, p) for p in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(percentile([7], 99), 7)
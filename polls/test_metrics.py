@@ -0,0 +1,92 @@
+import json
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import TestCase, Client
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from condorcet_backend import metrics
+from polls.models import QuickPoll
+from polls.views import get_condorcet_stats
+from django.utils import timezone
+from datetime import timedelta
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=1,
+        )
+        self.client = Client()
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def vote(self):
+        url = reverse('polls:poll_vote_api', kwargs={'external_id': self.poll.external_id})
+        # A new device each time, or the poll's device cookie would refuse the vote
+        self.client.cookies.pop('quickpolls_voted', None)
+        return self.client.post(url, json.dumps({'ranking': ['A', 'B']}), content_type='application/json')
+
+    def test_votes_are_counted_and_timed(self):
+        accepted = self.sample('fairpoll_votes_total', kind='api', outcome='accepted')
+        rejected = self.sample('fairpoll_votes_total', kind='api', outcome='rejected')
+        timed = self.sample('fairpoll_vote_seconds_count', kind='api')
+
+        self.assertEqual(self.vote().status_code, 201)
+        # max_participants is 1
+        self.assertEqual(self.vote().status_code, 400)
+
+        self.assertEqual(self.sample('fairpoll_votes_total', kind='api', outcome='accepted'), accepted + 1)
+        self.assertEqual(self.sample('fairpoll_votes_total', kind='api', outcome='rejected'), rejected + 1)
+        self.assertEqual(self.sample('fairpoll_vote_seconds_count', kind='api'), timed + 2)
+
+    def test_results_cache_and_tally(self):
+        self.vote()
+        self.poll.dead_line = timezone.now() - timedelta(minutes=1)
+        self.poll.save()
+        misses = self.sample('fairpoll_cache_requests_total', cache='results', result='miss')
+        hits = self.sample('fairpoll_cache_requests_total', cache='results', result='hit')
+        tallies = self.sample('fairpoll_tally_seconds_count', ballots='<100')
+
+        poll = QuickPoll.objects.with_ballot_count().get(pk=self.poll.pk)
+        get_condorcet_stats(poll)
+        get_condorcet_stats(poll)
+
+        self.assertEqual(self.sample('fairpoll_cache_requests_total', cache='results', result='miss'), misses + 1)
+        self.assertEqual(self.sample('fairpoll_cache_requests_total', cache='results', result='hit'), hits + 1)
+        self.assertEqual(self.sample('fairpoll_tally_seconds_count', ballots='<100'), tallies + 1)
+
+    def test_database_locked_is_counted(self):
+        locked = self.sample('fairpoll_database_locked_total')
+
+        for message in ('database is locked', 'database table is locked: polls_ballot', 'no such table: x'):
+            def execute(*args):
+                raise OperationalError(message)
+            with self.assertRaises(OperationalError):
+                metrics.count_locked(execute, 'SELECT 1', None, False, {})
+
+        self.assertEqual(self.sample('fairpoll_database_locked_total'), locked + 2)
+
+    def test_endpoint(self):
+        # The vote fills self.poll, which stops being active
+        self.vote()
+        QuickPoll.objects.create(
+            question='Still open?', options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1), max_participants=10,
+        )
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('fairpoll_votes_total{kind="api",outcome="accepted"}', body)
+        self.assertIn('fairpoll_vote_seconds_bucket{', body)
+        self.assertIn('fairpoll_active_polls{kind="quick"} 1.0', body)
+        self.assertIn('fairpoll_active_polls{kind="house"} 0.0', body)
+
+    def test_active_polls_are_not_counted_on_every_scrape(self):
+        self.client.get(reverse('metrics'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('metrics'))
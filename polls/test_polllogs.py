@@ -0,0 +1,81 @@
+import csv
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from polls.models import HousePoll, QuickPoll, PollLog
+from polls.management.commands import polllogs
+from houses.models import House
+from django.utils import timezone
+from datetime import timedelta
+
+User = get_user_model()
+
+class PollLogsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password')
+        house = House.objects.create(name='Test House', creator=self.user)
+        self.house_poll = HousePoll.objects.create(
+            question='House Poll Question?', options=['Yes', 'No'], house=house, creator=self.user,
+            dead_line=timezone.now() + timedelta(days=1), max_participants=10,
+        )
+        self.quick_poll = QuickPoll.objects.create(
+            question='Quick Poll Question?', options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1), max_participants=10,
+        )
+        self.house_poll.log_action('VISIT', user=self.user, ip_address='10.0.0.1')
+        self.house_poll.log_action('VOTE', user=self.user, ip_address='10.0.0.1')
+        self.quick_poll.log_action('VISIT', ip_address='10.0.0.2')
+        self.quick_poll.log_action('VOTE', ip_address='10.0.0.2')
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('polllogs', *args, stdout=out)
+        return out.getvalue()
+
+    def records(self, *args):
+        return [json.loads(line) for line in self.run_command('--format', 'jsonl', *args).splitlines()]
+
+    def test_text(self):
+        lines = self.run_command().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Action: VISIT | User: testuser | IP: 10.0.0.1', lines[0])
+        self.assertIn(f'Poll: {self.quick_poll.external_id} Quick Poll Question?', lines[3])
+        self.assertIn('User: Anonymous', lines[3])
+
+    def test_filters(self):
+        self.assertEqual([r['action'] for r in self.records('--action', 'VOTE')], ['VOTE', 'VOTE'])
+        self.assertEqual({r['ip'] for r in self.records('--ip', '10.0.0.2')}, {'10.0.0.2'})
+        records = self.records('--poll', self.house_poll.external_id)
+        self.assertEqual({(r['poll'], r['poll_type']) for r in records}, {(self.house_poll.external_id, 'housepoll')})
+        self.assertEqual(len(self.records('--since', timezone.localdate().isoformat())), 4)
+        self.assertEqual(self.records('--until', (timezone.localdate() - timedelta(days=1)).isoformat()), [])
+        self.assertEqual([r['id'] for r in self.records('--tail', '1')], [PollLog.objects.latest('pk').pk])
+        with self.assertRaises(CommandError):
+            self.run_command('--poll', 'NOPE0000')
+
+    def test_csv(self):
+        rows = list(csv.reader(StringIO(self.run_command('--format', 'csv'))))
+        self.assertEqual(rows[0], polllogs.FIELDS)
+        self.assertEqual(len(rows), 5)
+
+    def test_queries_do_not_grow_with_rows(self):
+        for i in range(20):
+            self.quick_poll.log_action('VISIT', ip_address=f'10.1.0.{i}')
+        with mock.patch.object(polllogs, 'CHUNK_SIZE', 10):
+            # 3 chunks of logs, the polls are looked up once per model
+            with self.assertNumQueries(3 + 2):
+                self.assertEqual(len(self.run_command().splitlines()), 24)
+
+    def test_follow(self):
+        def sleep(seconds):
+            if PollLog.objects.count() == 4:
+                self.quick_poll.log_action('VOTE', ip_address='10.0.0.3')
+            else:
+                raise KeyboardInterrupt
+        with mock.patch.object(polllogs.time, 'sleep', sleep):
+            records = self.records('--follow', '--tail', '1')
+        self.assertEqual([r['ip'] for r in records], ['10.0.0.2', '10.0.0.3'])
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, AsyncClient, override_settings
+from django.urls import reverse
+from polls.models import QuickPoll, Ballot
+from condorcet_backend import profiling
+from django.utils import timezone
+from datetime import timedelta
+
+User = get_user_model()
+
+@override_settings(PROFILING_ENABLED=True)
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        profiling.recent.clear()
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() - timedelta(minutes=1),
+            max_participants=10,
+        )
+        Ballot.objects.create(poll=self.poll, choices={'A': 1, 'B': 2})
+        self.url = reverse('polls:quickpoll_results', kwargs={'external_id': self.poll.external_id})
+
+    def timings(self, response):
+        return dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+
+    def test_server_timing_header(self):
+        response = Client().get(self.url)
+        timings = self.timings(response)
+        self.assertIn('total', timings)
+        self.assertIn('template', timings)
+        self.assertIn('tally', timings)
+        self.assertRegex(timings['db'], r'desc="[1-9]\d* queries"')
+
+    async def test_async_views_count_queries(self):
+        response = await AsyncClient().get(self.url)
+        self.assertRegex(self.timings(response)['db'], r'desc="[1-9]\d* queries"')
+
+    def test_report_is_staff_only(self):
+        client = Client()
+        client.get(self.url)
+        self.assertEqual(client.get(reverse('profiling')).status_code, 302)
+
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        client.login(username='staff', password='password')
+        response = client.get(reverse('profiling'))
+        endpoints = [row['endpoint'] for row in response.context['rows']]
+        self.assertIn('polls:quickpoll_results', endpoints)
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_off_by_default(self):
+        self.assertNotIn('Server-Timing', Client().get(self.url))
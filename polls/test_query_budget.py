@@ -0,0 +1,135 @@
+import difflib
+from asgiref.sync import async_to_sync
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+from houses.models import House
+from polls.models import HousePoll, QuickPoll, Ballot, PollLog, resolve_external_id
+
+User = get_user_model()
+
+APPS = ['polls', 'houses', 'users']
+SMALL, LARGE = 2, 20
+
+def named_routes(app):
+    """(namespaced name, URL parameters) of every named route of `app`."""
+    resolver = get_resolver(f'{app}.urls')
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{app}:{pattern.name}', list(pattern.pattern.converters)
+
+def consume(response):
+    if not response.is_async:
+        return b''.join(response.streaming_content)
+
+    async def read():
+        return b''.join([chunk async for chunk in response.streaming_content])
+    return async_to_sync(read)()
+
+@override_settings(RATELIMIT_ENABLED=False)
+class QueryBudgetTest(TestCase):
+    """
+    Every named route of polls, houses and users must issue the same number
+    of queries with SMALL and with LARGE amounts of surrounding data.
+    """
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='password')
+        self.house = House.objects.create(name='Budget House', creator=self.owner)
+        self.house.members.add(self.owner)
+        now = timezone.now()
+        self.house_polls = {
+            'active': HousePoll.objects.create(
+                question='Active?', options=['Yes', 'No'], house=self.house, creator=self.owner,
+                dead_line=now + timedelta(days=1), max_participants=1000, is_ticket_secured=True,
+            ),
+            'finished': HousePoll.objects.create(
+                question='Finished?', options=['Yes', 'No'], house=self.house, creator=self.owner,
+                dead_line=now - timedelta(days=1), max_participants=1000,
+            ),
+        }
+        self.quickpolls = {
+            'active': QuickPoll.objects.create(
+                question='Active?', options=['A', 'B', 'C'], owner=self.owner,
+                dead_line=now + timedelta(days=1), max_participants=1000, is_ticket_secured=True,
+            ),
+            'finished': QuickPoll.objects.create(
+                question='Finished?', options=['A', 'B', 'C'], owner=self.owner,
+                dead_line=now - timedelta(days=1), max_participants=1000,
+            ),
+        }
+        self.grown = 0
+        self.client = Client()
+        self.client.force_login(self.owner)
+
+    def grow_to(self, scale):
+        """Adds members, houses, polls, ballots and visits until there are `scale` of each."""
+        now = timezone.now()
+        for i in range(self.grown, scale):
+            user = User.objects.create_user(username=f'voter{i}')
+            user.houses.add(self.house, House.objects.create(name=f'House {i}', creator=user))
+            for poll in [*self.house_polls.values(), *self.quickpolls.values()]:
+                Ballot.objects.create(poll=poll, voter=user, choices={option: rank for rank, option in enumerate(poll.options, 1)})
+                PollLog.objects.create(poll=poll, action_type='VISIT', user=user, ip_address='10.0.0.1')
+            for finished in (False, True):
+                dead_line = now + timedelta(days=-1 if finished else 1)
+                house_poll = HousePoll.objects.create(
+                    question=f'House poll {i}?', options=['Yes', 'No'], house=self.house,
+                    creator=user, dead_line=dead_line, max_participants=1000,
+                )
+                quickpoll = QuickPoll.objects.create(
+                    question=f'Quick poll {i}?', options=['A', 'B'], owner=user,
+                    dead_line=dead_line, max_participants=1000,
+                )
+                for poll in (house_poll, quickpoll):
+                    Ballot.objects.create(poll=poll, voter=user, choices={poll.options[0]: 1, poll.options[1]: 2})
+        self.grown = scale
+
+    def route_kwargs(self, name, params):
+        kwargs = {}
+        for param in params:
+            if param in ('pk', 'house_pk'):
+                kwargs[param] = self.house.pk
+            elif param == 'user_id':
+                kwargs[param] = self.owner.pk
+            elif param == 'external_id':
+                state = 'finished' if name.endswith(('_results', '_export', 'poll_events')) else 'active'
+                polls = self.house_polls if name.startswith('polls:house_poll') else self.quickpolls
+                kwargs[param] = polls[state].external_id
+            else:
+                raise AssertionError(f"No fixture for <{param}> in {name}")
+        return kwargs
+
+    def capture(self, url):
+        """SQL of one GET of `url`, whose writes are rolled back afterwards."""
+        cache.clear()
+        resolve_external_id.cache_clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+                if response.streaming:
+                    consume(response)
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 500, url)
+        return [query['sql'] for query in queries.captured_queries]
+
+    def test_query_count_does_not_grow_with_data(self):
+        routes = [(name, self.route_kwargs(name, params)) for app in APPS for name, params in named_routes(app)]
+        self.assertGreater(len(routes), 20)
+
+        self.grow_to(SMALL)
+        small = {name: self.capture(reverse(name, kwargs=kwargs)) for name, kwargs in routes}
+        self.grow_to(LARGE)
+        large = {name: self.capture(reverse(name, kwargs=kwargs)) for name, kwargs in routes}
+
+        failures = []
+        for name, _kwargs in routes:
+            if len(small[name]) != len(large[name]):
+                diff = '\n'.join(difflib.unified_diff(small[name], large[name], 'small', 'large', lineterm=''))
+                failures.append(f"{name}: {len(small[name])} -> {len(large[name])} queries\n{diff}")
+        self.assertFalse(failures, '\n\n'.join(failures))
@@ -0,0 +1,94 @@
+import json
+from unittest import mock
+from django.test import TestCase, Client, override_settings
+from django.core.cache import caches
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from polls.models import QuickPoll
+from django.utils import timezone
+from datetime import timedelta
+
+User = get_user_model()
+
+LIMITS = {
+    'vote': [(('ip', 'poll', 'user'), 3, 1)],
+    'join': [(('ip',), 2, 1)],
+}
+
+@override_settings(RATELIMITS=LIMITS, RATELIMIT_ENABLED=True)
+class RateLimitTest(TestCase):
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=100,
+        )
+        self.client = Client()
+
+    def tearDown(self):
+        # Buckets outlive the test database, don't leave other tests throttled
+        caches['ratelimit'].clear()
+
+    def vote(self, **extra):
+        url = reverse('polls:poll_vote_api', kwargs={'external_id': self.poll.external_id})
+        # A new device each time, or the poll's device cookie would refuse the vote
+        self.client.cookies.pop('quickpolls_voted', None)
+        return self.client.post(url, json.dumps({'ranking': ['A', 'B']}), content_type='application/json', **extra)
+
+    @mock.patch('polls.ratelimit.time.time', return_value=1000.0)
+    def test_burst_then_429(self, _time):
+        for _ in range(3):
+            self.assertEqual(self.vote().status_code, 201)
+        # Rejected before touching the database
+        with self.assertNumQueries(0):
+            response = self.vote()
+        self.assertEqual(response.status_code, 429)
+        # The 3 second window started at 999
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertIn('error', response.json())
+        self.assertEqual(self.poll.ballots.count(), 3)
+
+    def test_bucket_refills(self):
+        with mock.patch('polls.ratelimit.time.time', return_value=1000.0):
+            for _ in range(3):
+                self.vote()
+            self.assertEqual(self.vote().status_code, 429)
+        with mock.patch('polls.ratelimit.time.time', return_value=1002.0):
+            self.assertEqual(self.vote().status_code, 201)
+
+    def test_buckets_are_per_client(self):
+        for _ in range(3):
+            self.vote()
+        self.assertEqual(self.vote().status_code, 429)
+        self.assertEqual(self.vote(REMOTE_ADDR='10.0.0.2').status_code, 201)
+
+    def test_client_chosen_values_do_not_open_a_new_bucket(self):
+        for _ in range(3):
+            self.vote()
+        # Only the hop nginx appended counts
+        self.assertEqual(self.vote(HTTP_X_FORWARDED_FOR='10.9.9.9, 127.0.0.1').status_code, 429)
+        self.client.cookies['csrftoken'] = 'another-browser'
+        self.client.cookies['sessionid'] = 'another-session'
+        self.assertEqual(self.vote().status_code, 429)
+
+    def test_logged_in_users_get_their_own_bucket(self):
+        for _ in range(3):
+            self.vote()
+        User.objects.create_user(username='voter', password='password')
+        self.client.login(username='voter', password='password')
+        self.assertEqual(self.vote().status_code, 201)
+
+    def test_join_is_limited_per_address(self):
+        url = reverse('polls:poll_join')
+        for guess in ('AAAA0000', 'AAAA0001'):
+            self.assertEqual(self.client.post(url, {'poll_id': guess}).status_code, 302)
+        self.assertEqual(self.client.post(url, {'poll_id': 'AAAA0002'}).status_code, 429)
+        # Reading the form is not limited
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_can_be_disabled(self):
+        for _ in range(5):
+            self.assertEqual(self.vote().status_code, 201)
@@ -0,0 +1,72 @@
+from unittest import mock
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from polls.models import HousePoll, QuickPoll, PollCode, resolve_external_id
+from houses.models import House
+from django.utils import timezone
+from datetime import timedelta
+
+User = get_user_model()
+
+class PollCodeRegistryTest(TestCase):
+    def setUp(self):
+        resolve_external_id.cache_clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.house = House.objects.create(name='Test House', creator=self.user)
+        self.house.members.add(self.user)
+        self.house_poll = HousePoll.objects.create(
+            question='House Poll Question?',
+            options=['Yes', 'No'],
+            house=self.house,
+            creator=self.user,
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=10,
+        )
+        self.quick_poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=10,
+        )
+        self.client = Client()
+
+    def test_every_poll_is_registered(self):
+        self.assertEqual(resolve_external_id(self.house_poll.external_id), (HousePoll, self.house_poll.pk))
+        self.assertEqual(resolve_external_id(self.quick_poll.external_id), (QuickPoll, self.quick_poll.pk))
+
+    def test_codes_are_unique_across_poll_kinds(self):
+        taken = self.house_poll.external_id
+        fresh = 'FRESH123'
+        with mock.patch('polls.models.generate_ticket_code', side_effect=[fresh]):
+            poll = QuickPoll(
+                question='Clash?',
+                options=['A', 'B'],
+                dead_line=timezone.now() + timedelta(days=1),
+                max_participants=10,
+                external_id=taken,
+            )
+            poll.save()
+        self.assertEqual(poll.external_id, fresh)
+        self.assertEqual(resolve_external_id(fresh), (QuickPoll, poll.pk))
+        self.assertEqual(resolve_external_id(taken), (HousePoll, self.house_poll.pk))
+
+    def test_poll_join_resolves_both_kinds(self):
+        url = reverse('polls:poll_join')
+        response = self.client.post(url, {'poll_id': self.house_poll.external_id})
+        self.assertRedirects(response, reverse('polls:house_poll_detail', kwargs={'external_id': self.house_poll.external_id}), fetch_redirect_response=False)
+        response = self.client.post(url, {'poll_id': self.quick_poll.external_id})
+        self.assertRedirects(response, reverse('polls:quickpoll_detail', kwargs={'external_id': self.quick_poll.external_id}), fetch_redirect_response=False)
+
+    def test_resolution_is_cached(self):
+        resolve_external_id(self.quick_poll.external_id)
+        with self.assertNumQueries(0):
+            resolve_external_id(self.quick_poll.external_id)
+
+    def test_deleted_poll_is_forgotten(self):
+        code = self.quick_poll.external_id
+        resolve_external_id(code)
+        self.quick_poll.delete()
+        self.assertFalse(PollCode.objects.filter(code=code).exists())
+        with self.assertRaises(PollCode.DoesNotExist):
+            resolve_external_id(code)
@@ -0,0 +1,52 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from polls.models import QuickPoll, Ballot
+from polls.views import calculate_condorcet
+from django.utils import timezone
+from datetime import timedelta
+
+class ResultsTableTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = QuickPoll.objects.create(
+            question='Favourite colour?',
+            options=['Red', 'Green', 'Blue'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=3,
+        )
+        for choices in ({'Red': 1, 'Green': 2, 'Blue': 3},
+                        {'Red': 1, 'Green': 3, 'Blue': 2},
+                        {'Red': 3, 'Green': 1, 'Blue': 2}):
+            Ballot.objects.create(poll=self.poll, choices=choices)
+        self.client = Client()
+
+    def test_table_is_ordered_with_margins(self):
+        stats = calculate_condorcet(self.poll)
+        table = stats['table']
+        self.assertEqual([row['option'] for row in table], ['Red', 'Green', 'Blue'])
+
+        red = table[0]
+        self.assertEqual((red['wins'], red['losses'], red['ties']), (2, 0, 0))
+        self.assertEqual([cell['css'] for cell in red['cells']], ['h2h-self', 'h2h-win', 'h2h-win'])
+        self.assertEqual([cell['value'] for cell in red['cells']], [None, 2, 2])
+        self.assertEqual([cell['margin'] for cell in red['cells']], [None, 1, 1])
+
+        blue = table[2]
+        self.assertEqual([cell['css'] for cell in blue['cells']], ['h2h-loss', 'h2h-loss', 'h2h-self'])
+
+    def test_results_page_renders_table(self):
+        url = reverse('polls:quickpoll_results', kwargs={'external_id': self.poll.external_id})
+        response = self.client.get(url)
+        self.assertContains(response, '<td class="h2h-win" title="Margin: 1">2</td>', count=3, html=False)
+        self.assertContains(response, '<td class="h2h-self">-</td>', count=3, html=False)
+
+    def test_wide_table_is_rendered_once(self):
+        self.poll.options = [f'Option {i}' for i in range(25)]
+        self.poll.save()
+        url = reverse('polls:quickpoll_results', kwargs={'external_id': self.poll.external_id})
+        first = self.client.get(url)
+        self.assertTrue(first.context['cache_results_table'])
+        with self.assertTemplateNotUsed('polls/results_table.html'):
+            second = self.client.get(url)
+        self.assertContains(second, 'vs Option 24')
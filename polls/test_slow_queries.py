@@ -0,0 +1,70 @@
+import json
+from django.db import connection
+from django.test import TestCase, Client, AsyncClient, override_settings
+from django.urls import reverse
+from polls.models import QuickPoll, Ballot
+from condorcet_backend import slowqueries
+from django.utils import timezone
+from datetime import timedelta
+
+# 0 ms: every statement is slow
+@override_settings(SLOW_QUERY_MS=0)
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        self.poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() - timedelta(minutes=1),
+            max_participants=10,
+        )
+        Ballot.objects.create(poll=self.poll, choices={'A': 1, 'B': 2})
+        self.url = reverse('polls:quickpoll_results', kwargs={'external_id': self.poll.external_id})
+
+    def records(self, logs):
+        return [json.loads(line.split(':', 2)[2]) for line in logs.output]
+
+    def test_records_view_and_plan(self):
+        with self.assertLogs('condorcet_backend.slowqueries') as logs:
+            Client().get(self.url)
+        records = self.records(logs)
+        ballots = [r for r in records if 'FROM "polls_ballot"' in r['sql'] and r['sql'].startswith('SELECT')]
+        self.assertTrue(ballots)
+        self.assertEqual({r['view'] for r in records}, {'polls:quickpoll_results'})
+        self.assertEqual(ballots[0]['path'], self.url)
+        self.assertTrue(ballots[0]['plan'])
+        self.assertGreaterEqual(ballots[0]['ms'], 0)
+
+    async def test_async_views(self):
+        with self.assertLogs('condorcet_backend.slowqueries') as logs:
+            await AsyncClient().get(self.url)
+        self.assertIn('polls:quickpoll_results', {r['view'] for r in self.records(logs)})
+
+    @override_settings(SLOW_QUERY_MS=None)
+    def test_disabled(self):
+        with self.assertNoLogs('condorcet_backend.slowqueries'):
+            Client().get(self.url)
+
+    def test_full_scans_are_flagged(self):
+        connection.ensure_connection()
+        plan = slowqueries.explain(connection, 'SELECT * FROM "polls_ballot" WHERE "choices" LIKE %s', ['%A%'])
+        self.assertEqual([m.group(1) for m in map(slowqueries.FULL_SCAN_RE.match, plan) if m], ['polls_ballot'])
+        plan = slowqueries.explain(connection, 'SELECT * FROM "polls_ballot" WHERE "id" = %s', [1])
+        self.assertFalse([line for line in plan if slowqueries.FULL_SCAN_RE.match(line)])
+
+    def test_scan_lines(self):
+        def scans(*plan):
+            return [m.group(1) for m in map(slowqueries.FULL_SCAN_RE.match, plan) if m]
+        self.assertEqual(scans('SCAN polls_ballot'), ['polls_ballot'])
+        # Older SQLite versions
+        self.assertEqual(scans('SCAN TABLE polls_ballot'), ['polls_ballot'])
+        self.assertEqual(scans('SCAN polls_ballot USING INDEX polls_ballot_poll_idx'), [])
+        self.assertEqual(scans('SCAN polls_ballot USING COVERING INDEX polls_ballot_poll_idx'), [])
+        self.assertEqual(scans('SEARCH polls_ballot USING INTEGER PRIMARY KEY (rowid=?)'), [])
+
+    def test_wrappers_are_installed_once(self):
+        Client().get(self.url)
+        slowqueries.install()
+        self.assertEqual(connection.execute_wrappers.count(slowqueries.log_slow_query), 1)
+        # The metrics wrapper goes through the same hookup
+        from condorcet_backend import metrics
+        self.assertEqual(connection.execute_wrappers.count(metrics.count_locked), 1)
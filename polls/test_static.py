@@ -0,0 +1,46 @@
+import gzip
+import os
+import shutil
+import tempfile
+import brotli
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+from condorcet_backend.storage import CompressedManifestStaticFilesStorage
+
+class CompressedManifestStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = CompressedManifestStaticFilesStorage(location=self.root, base_url='/static/')
+        self.css = 'body { background: url("../img/dot.png"); }\n' + '.rule { color: red; }\n' * 100
+        self.storage.save('css/site.css', ContentFile(self.css.encode()))
+        self.storage.save('css/tiny.css', ContentFile(b'a{}'))
+        self.storage.save('img/dot.png', ContentFile(b'\x89PNG' + b'\0' * 500))
+
+    def collect(self):
+        paths = {name: (self.storage, name) for name in ('css/site.css', 'css/tiny.css', 'img/dot.png')}
+        for _name, _hashed, processed in self.storage.post_process(paths):
+            if isinstance(processed, Exception):
+                raise processed
+        self.storage.save_manifest()
+
+    def test_hashed_files_get_compressed_copies(self):
+        self.collect()
+        hashed = self.storage.stored_name('css/site.css')
+        self.assertRegex(hashed, r'^css/site\.[0-9a-f]{12}\.css$')
+        path = self.storage.path(hashed)
+        with open(path, 'rb') as f:
+            content = f.read()
+        # References are rewritten to hashed names too
+        self.assertIn(self.storage.stored_name('img/dot.png').split('/')[-1].encode(), content)
+        with open(path + '.gz', 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), content)
+        with open(path + '.br', 'rb') as f:
+            self.assertEqual(brotli.decompress(f.read()), content)
+
+    def test_small_and_binary_files_are_left_alone(self):
+        self.collect()
+        for name in ('css/tiny.css', 'img/dot.png'):
+            path = self.storage.path(self.storage.stored_name(name))
+            self.assertFalse(os.path.exists(path + '.gz'), name)
+            self.assertFalse(os.path.exists(path + '.br'), name)
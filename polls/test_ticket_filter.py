@@ -0,0 +1,91 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+from django.test import TestCase
+from polls.models import QuickPoll, Ticket
+from polls import ticket_filter
+from django.utils import timezone
+from datetime import timedelta
+
+class TicketFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = QuickPoll.objects.create(
+            question='Secured?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=5,
+            is_ticket_secured=True,
+        )
+        self.poll = QuickPoll.objects.with_ballot_count().get(pk=self.poll.pk)
+        self.codes = list(self.poll.tickets.values_list('code', flat=True))
+
+    def test_built_with_the_tickets(self):
+        numbers = cache.get(ticket_filter.poll_key(self.poll))
+        self.assertEqual(list(numbers), sorted(int(code, 36) for code in self.codes))
+
+    def test_wrong_codes_are_rejected_without_queries(self):
+        for code in ('ZZZZZZZZ', 'bad code', 'TOOLONGCODE', 'ÉÉÉÉ'):
+            with self.assertNumQueries(0):
+                with self.assertRaisesMessage(ValueError, "Invalid or used ticket."):
+                    self.poll.save_ballot(choices={'A': 1, 'B': 2}, ticket_code=code)
+
+    def test_claimed_codes_are_removed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.poll.save_ballot(choices={'A': 1, 'B': 2}, ticket_code=self.codes[0])
+        self.assertFalse(ticket_filter.may_be_unused(self.poll, self.codes[0]))
+        self.assertTrue(ticket_filter.may_be_unused(self.poll, self.codes[1]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.poll.import_ballots([({'A': 1, 'B': 2}, code) for code in self.codes[1:3]])
+        self.assertEqual(sum(ticket_filter.may_be_unused(self.poll, code) for code in self.codes), 2)
+
+    def test_lost_cache_is_rebuilt(self):
+        cache.clear()
+        self.assertTrue(ticket_filter.may_be_unused(self.poll, self.codes[0]))
+        self.assertFalse(ticket_filter.may_be_unused(self.poll, 'ZZZZZZZZ'))
+
+    def test_new_ticket_is_accepted(self):
+        Ticket.objects.create(poll=self.poll, code='EXTRA001')
+        self.poll.save_ballot(choices={'A': 1, 'B': 2}, ticket_code='EXTRA001')
+        self.assertTrue(Ticket.objects.get(code='EXTRA001').is_used)
+
+    def test_stale_code_is_still_checked_in_database(self):
+        Ticket.objects.filter(code=self.codes[0]).update(is_used=True)
+        self.assertTrue(ticket_filter.may_be_unused(self.poll, self.codes[0]))
+        with self.assertRaisesMessage(ValueError, "Invalid or used ticket."):
+            self.poll.save_ballot(choices={'A': 1, 'B': 2}, ticket_code=self.codes[0])
+
+    def test_ticket_claimed_by_a_concurrent_vote_is_rejected(self):
+        original_get = QuerySet.get
+
+        def get_then_claim(queryset, *args, **kwargs):
+            # Another vote claims the ticket right after this one read it
+            obj = original_get(queryset, *args, **kwargs)
+            if isinstance(obj, Ticket):
+                Ticket.objects.filter(pk=obj.pk).update(is_used=True)
+            return obj
+
+        with mock.patch.object(QuerySet, 'get', get_then_claim):
+            with self.assertRaisesMessage(ValueError, "Invalid or used ticket."):
+                self.poll.save_ballot(choices={'A': 1, 'B': 2}, ticket_code=self.codes[0])
+        self.assertFalse(self.poll.ballots.exists())
+
+    def test_import_reads_the_filter_once(self):
+        with mock.patch.object(ticket_filter, 'load', wraps=ticket_filter.load) as load:
+            self.poll.import_ballots([({'A': 1, 'B': 2}, code) for code in self.codes])
+        self.assertEqual(load.call_count, 1)
+
+    def test_generating_tickets_builds_the_filter_once(self):
+        with mock.patch.object(ticket_filter, 'forget') as forget, \
+                mock.patch.object(ticket_filter, 'build', wraps=ticket_filter.build) as build:
+            poll = QuickPoll.objects.create(
+                question='Many tickets?',
+                options=['A', 'B'],
+                dead_line=timezone.now() + timedelta(days=1),
+                max_participants=50,
+                is_ticket_secured=True,
+            )
+        forget.assert_not_called()
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(len(cache.get(ticket_filter.poll_key(poll))), 50)
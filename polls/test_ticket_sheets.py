@@ -0,0 +1,79 @@
+import re
+import zlib
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from polls.models import HousePoll
+from polls import ticket_sheets
+from houses.models import House
+
+User = get_user_model()
+
+def pdf_objects(pdf):
+    """Object bodies by number, checked against the xref table."""
+    start = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', pdf).group(1))
+    size = int(re.match(rb'xref\n0 (\d+)\n', pdf[start:]).group(1))
+    entries = pdf[start:].split(b'\n')[3:2 + size]
+    objects = {}
+    for number, entry in enumerate(entries, 1):
+        offset = int(entry[:10])
+        assert pdf[offset:].startswith(b'%d 0 obj\n' % number), number
+        objects[number] = pdf[offset:pdf.index(b'\nendobj\n', offset)]
+    return objects
+
+class TicketSheetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='creator', password='password')
+        self.house = House.objects.create(name='Sheet House', creator=self.user)
+        self.poll = HousePoll.objects.create(
+            question='Printed?',
+            house=self.house,
+            creator=self.user,
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=30,
+            is_ticket_secured=True,
+        )
+        self.url = reverse('polls:house_poll_tickets_sheet', kwargs={'external_id': self.poll.external_id})
+        self.client.login(username='creator', password='password')
+
+    def test_sheet_has_a_page_per_24_tickets(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn(f'house_poll_{self.poll.external_id}_tickets.pdf', response['Content-Disposition'])
+        objects = pdf_objects(response.content)
+        self.assertIn(b'/Count 2 ', objects[2])
+        image = objects[5]
+        bitmap = zlib.decompress(image[image.index(b'stream\n') + 7:image.rindex(b'\nendstream')])
+        width, height = ticket_sheets.PAGE_SIZE
+        self.assertEqual(len(bitmap), (width + 7) // 8 * height)
+
+    def test_sheet_is_cached_until_a_ticket_is_claimed(self):
+        with mock.patch.object(ticket_sheets, 'render', wraps=ticket_sheets.render) as render:
+            self.client.get(self.url)
+            self.client.get(self.url)
+            self.assertEqual(render.call_count, 1)
+            title, vote_url, codes, _workers = render.call_args.args
+            self.assertEqual(vote_url, 'http://testserver' + reverse('polls:house_poll_vote', args=[self.poll.external_id]))
+            self.assertEqual(len(codes), 30)
+
+            self.poll.save_ballot(choices={}, ticket_code=codes[0])
+            self.client.get(self.url)
+            self.assertEqual(render.call_count, 2)
+            self.assertNotIn(codes[0], render.call_args.args[2])
+
+    def test_only_creator_gets_the_sheet(self):
+        User.objects.create_user(username='other', password='password')
+        self.client.login(username='other', password='password')
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_vote_page_fills_in_the_ticket(self):
+        code = self.poll.tickets.first().code
+        vote_url = reverse('polls:house_poll_vote', kwargs={'external_id': self.poll.external_id})
+        response = self.client.get(ticket_sheets.ticket_url(vote_url, code))
+        self.assertContains(response, f'value="{code}"')
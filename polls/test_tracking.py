@@ -0,0 +1,98 @@
+from unittest import mock
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import TestCase, Client, AsyncClient, RequestFactory
+from django.urls import reverse
+from polls import tracking
+from polls.models import QuickPoll
+from django.utils import timezone
+from datetime import timedelta
+
+class TrackingTest(TestCase):
+    def request_with(self, response=None):
+        request = RequestFactory().get('/')
+        if response is not None:
+            request.COOKIES = {name: morsel.value for name, morsel in response.cookies.items()}
+        return request
+
+    def test_track_and_read_back(self):
+        response = tracking.track(self.request_with(), HttpResponse(), tracking.VOTED, 'ABCD1234')
+        request = self.request_with(response)
+        self.assertTrue(tracking.is_tracked(request, tracking.VOTED, 'ABCD1234'))
+        self.assertFalse(tracking.is_tracked(request, tracking.CREATED, 'ABCD1234'))
+        self.assertFalse(tracking.is_tracked(request, tracking.VOTED, 'ZZZZ0000'))
+
+    def test_oldest_entries_drop_out(self):
+        request = self.request_with()
+        response = HttpResponse()
+        for i in range(tracking.MAX_ENTRIES + 5):
+            tracking.track(request, response, tracking.VOTED, f'POLL{i:04d}')
+        entries = tracking.tracked(self.request_with(response), tracking.VOTED)
+        self.assertEqual(len(entries), tracking.MAX_ENTRIES)
+        self.assertNotIn('POLL0000', entries)
+        self.assertIn(f'POLL{tracking.MAX_ENTRIES + 4:04d}', entries)
+
+    def test_entries_expire(self):
+        with mock.patch('polls.tracking.time.time', return_value=timezone.now().timestamp() - tracking.MAX_AGE - 60):
+            response = tracking.track(self.request_with(), HttpResponse(), tracking.VOTED, 'OLD00000')
+        request = self.request_with(response)
+        tracking.track(request, response, tracking.VOTED, 'NEW00000')
+        self.assertEqual(list(tracking.tracked(self.request_with(response), tracking.VOTED)), ['NEW00000'])
+
+    def test_tampered_cookie_is_ignored(self):
+        request = RequestFactory().get('/')
+        request.COOKIES = {tracking.COOKIE_NAMES[tracking.VOTED]: 'ABCD1234.lx2k3m'}
+        self.assertFalse(tracking.is_tracked(request, tracking.VOTED, 'ABCD1234'))
+
+    def test_anonymous_vote_writes_no_session(self):
+        poll = QuickPoll.objects.create(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=10,
+        )
+        client = Client()
+        url = reverse('polls:quickpoll_vote', kwargs={'external_id': poll.external_id})
+        client.post(url, {'rank_0': 1, 'rank_1': 2})
+        self.assertEqual(Session.objects.count(), 0)
+        response = client.post(url, {'rank_0': 1, 'rank_1': 2})
+        self.assertRedirects(response, reverse('polls:quickpoll_detail', kwargs={'external_id': poll.external_id}), fetch_redirect_response=False)
+        self.assertEqual(poll.ballots.count(), 1)
+
+    def test_session_lists_move_to_cookies(self):
+        poll = QuickPoll.objects.create(
+            question='Secured?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=2,
+            is_ticket_secured=True,
+        )
+        client = Client()
+        session = client.session
+        session['created_quickpolls'] = [poll.external_id]
+        session.save()
+
+        url = reverse('polls:quickpoll_tickets_export', kwargs={'external_id': poll.external_id})
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(tracking.COOKIE_NAMES[tracking.CREATED], response.cookies)
+        self.assertNotIn('created_quickpolls', client.session)
+        # The cookie alone grants access from now on
+        self.assertEqual(client.get(url).status_code, 200)
+
+    async def test_session_lists_move_to_cookies_in_async_stack(self):
+        poll = await QuickPoll.objects.acreate(
+            question='Quick Poll Question?',
+            options=['A', 'B'],
+            dead_line=timezone.now() + timedelta(days=1),
+            max_participants=10,
+        )
+        client = AsyncClient()
+        session = await client.asession()
+        await session.aset('voted_quickpolls', [poll.external_id])
+        await session.asave()
+
+        url = reverse('polls:quickpoll_vote', kwargs={'external_id': poll.external_id})
+        response = await client.get(url)
+        self.assertRedirects(response, reverse('polls:quickpoll_detail', kwargs={'external_id': poll.external_id}), fetch_redirect_response=False)
+        self.assertIn(tracking.COOKIE_NAMES[tracking.VOTED], response.cookies)
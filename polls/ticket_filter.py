@@ -0,0 +1,83 @@
+"""
+Unused ticket codes of a poll, as a sorted array of integers in the cache.
+
+Ticket codes are base 36 strings of at most 8 characters, so each one fits
+in an unsigned 64-bit integer and the whole set of a poll is a compact
+array('Q'): 8 bytes per ticket, searched by bisection. A code that is not
+in the array is rejected without touching the database; one that is still
+goes through the usual query, which has the final say.
+
+The array is built when the tickets are generated (or on the first lookup
+after the cache lost it) and codes are removed once their vote is
+committed. Concurrent removals may put back a used code, which only costs
+a query; a code is never missing while its ticket is unused, because
+creating a ticket drops the array (generate_tickets bulk inserts and
+rebuilds it once).
+"""
+from array import array
+from bisect import bisect_left
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+MAX_CODE_LENGTH = 8
+
+
+def cache_key(content_type_id, object_id):
+    return f"ticket-filter:{content_type_id}:{object_id}"
+
+
+def poll_key(poll):
+    return cache_key(ContentType.objects.get_for_model(poll).pk, poll.pk)
+
+
+def encode(code):
+    """Integer of a ticket code, None when it can't be a ticket code."""
+    if not code or len(code) > MAX_CODE_LENGTH or not code.isalnum() or not code.isascii():
+        return None
+    return int(code, 36)
+
+
+def build(poll):
+    """Reads the unused codes of `poll` and caches them. One query."""
+    codes = poll.tickets.filter(is_used=False).values_list('code', flat=True)
+    numbers = array('Q', sorted(n for n in map(encode, codes) if n is not None))
+    cache.set(poll_key(poll), numbers, CACHE_TIMEOUT)
+    return numbers
+
+
+def load(poll):
+    numbers = cache.get(poll_key(poll))
+    if numbers is None:
+        numbers = build(poll)
+    return numbers
+
+
+def contains(numbers, number):
+    i = bisect_left(numbers, number)
+    return i < len(numbers) and numbers[i] == number
+
+
+def contains_code(numbers, code):
+    number = encode(code)
+    return number is not None and contains(numbers, number)
+
+
+def may_be_unused(poll, code):
+    """False when `code` is certainly not an unused ticket of `poll`."""
+    return contains_code(load(poll), code)
+
+
+def discard(poll, codes):
+    """Removes claimed `codes` from the cached array, if it is cached."""
+    key = poll_key(poll)
+    numbers = cache.get(key)
+    if numbers is None:
+        return
+    claimed = {encode(code) for code in codes}
+    cache.set(key, array('Q', (n for n in numbers if n not in claimed)), CACHE_TIMEOUT)
+
+
+def forget(content_type_id, object_id):
+    cache.delete(cache_key(content_type_id, object_id))
@@ -0,0 +1,159 @@
+"""
+Printable ticket sheets: one QR code per unused ticket, linking to the vote
+page with the code filled in, laid out on A4 pages and returned as a PDF.
+
+Pages are drawn in a small process pool (TICKET_SHEET_WORKERS per web
+worker), several pages per task, and the event loop only waits on the
+futures. Each worker
+returns its pages as zlib-compressed 1-bit bitmaps, which PDF takes as is
+(FlateDecode image), so assembling the document is a matter of writing the
+object table around them. The pool is started on first use; workers only
+import this module, qrcode and Pillow.
+"""
+import asyncio
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlencode
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+# A4 at 150 dpi, in pixels and in PDF points
+PAGE_SIZE = (1240, 1754)
+PAGE_POINTS = (595.28, 841.89)
+MARGIN = 60
+COLUMNS, ROWS = 4, 6
+PER_PAGE = COLUMNS * ROWS
+PAGES_PER_TASK = 4
+QR_SIZE = 210
+MASK_PATTERN = 2
+TITLE_LENGTH = 90
+
+_executor = None
+
+
+def ticket_url(vote_url, code):
+    return f"{vote_url}?{urlencode({'ticket': code})}"
+
+
+def executor(workers):
+    """The shared pool, started with `workers` processes on first use."""
+    global _executor
+    if _executor is None:
+        # Forking a threaded web worker is unsafe; spawned workers start clean
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def new_qr(version=None):
+    # Any mask is valid; scoring all eight to pick the best takes 80% of the time
+    return qrcode.QRCode(
+        version=version, error_correction=qrcode.constants.ERROR_CORRECT_M, border=2, mask_pattern=MASK_PATTERN,
+    )
+
+
+def qr_version(url):
+    """
+    Smallest QR version holding `url`. Given the longest URL of a sheet, all
+    its codes get the same size.
+    """
+    qr = new_qr()
+    qr.add_data(url)
+    return qr.best_fit()
+
+
+def qr_image(data, version):
+    qr = new_qr(version)
+    qr.add_data(data)
+    qr.make(fit=False)
+    matrix = qr.get_matrix()
+    size = len(matrix)
+    image = Image.new("1", (size, size), 1)
+    image.putdata([0 if dark else 1 for row in matrix for dark in row])
+    scale = max(QR_SIZE // size, 1)
+    return image.resize((size * scale, size * scale), Image.NEAREST)
+
+
+def render_page(title, footer, tickets, version):
+    """Draws one page of (code, url) pairs; returns its compressed bitmap."""
+    page = Image.new("1", PAGE_SIZE, 1)
+    draw = ImageDraw.Draw(page)
+    small = ImageFont.load_default(size=22)
+    code_font = ImageFont.load_default(size=28)
+    draw.text((MARGIN, MARGIN // 2), title, font=small, fill=0, anchor="lm")
+    draw.text((PAGE_SIZE[0] - MARGIN, PAGE_SIZE[1] - MARGIN // 2), footer, font=small, fill=0, anchor="rm")
+
+    cell_width = (PAGE_SIZE[0] - 2 * MARGIN) // COLUMNS
+    cell_height = (PAGE_SIZE[1] - 2 * MARGIN) // ROWS
+    for i, (code, url) in enumerate(tickets):
+        left = MARGIN + (i % COLUMNS) * cell_width
+        top = MARGIN + (i // COLUMNS) * cell_height
+        # Dotted cutting guides
+        for x in range(left, left + cell_width, 8):
+            draw.point([(x, top), (x, top + cell_height - 1)], fill=0)
+        for y in range(top, top + cell_height, 8):
+            draw.point([(left, y), (left + cell_width - 1, y)], fill=0)
+        qr = qr_image(url, version)
+        page.paste(qr, (left + (cell_width - qr.width) // 2, top + 12))
+        draw.text((left + cell_width // 2, top + cell_height - 28), code, font=code_font, fill=0, anchor="mm")
+    return zlib.compress(page.tobytes())
+
+
+def render_pages(title, pages, version):
+    return [render_page(title, footer, tickets, version) for footer, tickets in pages]
+
+
+def build_pdf(bitmaps):
+    """A PDF with one full-page bitmap per page."""
+    width, height = PAGE_SIZE
+    objects = []
+    kids = []
+    for bitmap in bitmaps:
+        first = 3 + len(objects)
+        kids.append(f"{first} 0 R")
+        content = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % PAGE_POINTS
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] " % PAGE_POINTS
+            + b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>" % (first + 2, first + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+            b"/BitsPerComponent 1 /Filter /FlateDecode /Length %d >>\nstream\n" % (width, height, len(bitmap))
+            + bitmap + b"\nendstream"
+        )
+    objects[:0] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode(),
+    ]
+
+    chunks = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+    offsets = []
+    position = len(chunks[0])
+    for number, body in enumerate(objects, 1):
+        chunk = b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        offsets.append(position)
+        chunks.append(chunk)
+        position += len(chunk)
+    chunks.append(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    chunks.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+    chunks.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, position))
+    return b"".join(chunks)
+
+
+async def render(title, vote_url, codes, workers):
+    """PDF sheet of `codes`, drawn in the pool without blocking the event loop."""
+    tickets = [(code, ticket_url(vote_url, code)) for code in codes]
+    title = title if len(title) <= TITLE_LENGTH else title[:TITLE_LENGTH - 3] + "..."
+    pages = [tickets[i:i + PER_PAGE] for i in range(0, len(tickets), PER_PAGE)] or [[]]
+    pages = [(f"{n}/{len(pages)}", page) for n, page in enumerate(pages, 1)]
+    pool = executor(workers)
+    longest = max((url for _code, url in tickets), key=len, default="")
+    version = await asyncio.wrap_future(pool.submit(qr_version, longest))
+    futures = [
+        asyncio.wrap_future(pool.submit(render_pages, title, pages[i:i + PAGES_PER_TASK], version))
+        for i in range(0, len(pages), PAGES_PER_TASK)
+    ]
+    bitmaps = [bitmap for batch in await asyncio.gather(*futures) for bitmap in batch]
+    return build_pdf(bitmaps)
@@ -0,0 +1,138 @@
+"""
+Quick polls this device voted in or created.
+
+Each kind is kept in its own signed cookie as "ID.added,ID.added,..."
+(added is a base 36 timestamp) instead of a list in the session: reading it
+costs no session load and recording a vote no session write. A cookie holds
+at most MAX_ENTRIES IDs, the oldest dropping out first, and an entry
+expires after MAX_AGE. Only MAX_QUICKPOLL quick polls exist at any time, so
+neither bound forgets a poll that is still around in practice.
+
+The cookie is parsed once per request into a dict, so lookups are O(1).
+
+Devices that still carry the session lists used before these cookies
+(voted_quickpolls, created_quickpolls) get them moved into the cookies by
+SessionListsMiddleware on their next request, so creators keep access to
+the tickets of polls still running.
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.http import base36_to_int, int_to_base36
+
+VOTED = 'voted'
+CREATED = 'created'
+
+COOKIE_NAMES = {
+    VOTED: 'quickpolls_voted',
+    CREATED: 'quickpolls_created',
+}
+# Session keys of the lists these cookies replace
+SESSION_KEYS = {
+    VOTED: 'voted_quickpolls',
+    CREATED: 'created_quickpolls',
+}
+SALT = 'polls.tracking'
+MAX_ENTRIES = 64
+MAX_AGE = 60 * 60 * 24 * 90
+
+
+def tracked(request, kind):
+    """
+    {external_id: timestamp} of the polls of `kind` recorded on this device,
+    oldest first.
+    """
+    attr = f'_tracked_{kind}'
+    entries = getattr(request, attr, None)
+    if entries is None:
+        raw = request.get_signed_cookie(COOKIE_NAMES[kind], default='', salt=SALT, max_age=MAX_AGE)
+        cutoff = time.time() - MAX_AGE
+        entries = {}
+        for item in raw.split(',') if raw else ():
+            external_id, _, added = item.partition('.')
+            try:
+                added = base36_to_int(added)
+            except ValueError:
+                continue
+            if added > cutoff:
+                entries[external_id] = added
+        setattr(request, attr, entries)
+    return entries
+
+
+def is_tracked(request, kind, external_id):
+    return str(external_id) in tracked(request, kind)
+
+
+def track(request, response, kind, external_id):
+    """
+    Records `external_id` under `kind` and writes the cookie on `response`.
+    """
+    entries = tracked(request, kind)
+    entries.pop(str(external_id), None)
+    entries[str(external_id)] = int(time.time())
+    return write(response, kind, entries)
+
+
+def write(response, kind, entries):
+    while len(entries) > MAX_ENTRIES:
+        del entries[next(iter(entries))]
+    response.set_signed_cookie(
+        COOKIE_NAMES[kind],
+        ','.join(f'{key}.{int_to_base36(added)}' for key, added in entries.items()),
+        salt=SALT,
+        max_age=MAX_AGE,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite='Lax',
+    )
+    return response
+
+
+def merge_session_list(request, kind, external_ids):
+    entries = tracked(request, kind)
+    now = int(time.time())
+    for external_id in external_ids or ():
+        entries.setdefault(str(external_id), now)
+
+
+class SessionListsMiddleware:
+    """
+    Moves the session lists of SESSION_KEYS into the cookies. The session
+    is only looked at when the request sends one; once the lists are gone
+    this is a lookup in an already loaded session.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        moved = []
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            for kind, key in SESSION_KEYS.items():
+                if key in request.session:
+                    merge_session_list(request, kind, request.session.pop(key))
+                    moved.append(kind)
+        return self.write_moved(request, self.get_response(request), moved)
+
+    async def __acall__(self, request):
+        moved = []
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            for kind, key in SESSION_KEYS.items():
+                if await request.session.ahas_key(key):
+                    merge_session_list(request, kind, await request.session.apop(key))
+                    moved.append(kind)
+        return self.write_moved(request, await self.get_response(request), moved)
+
+    def write_moved(self, request, response, moved):
+        for kind in moved:
+            write(response, kind, tracked(request, kind))
+        return response
@@ -10,6 +10,7 @@ urlpatterns = [
     path('house_poll/<str:external_id>/results/', views.house_poll_results, name='house_poll_results'),
     path('house_poll/<str:external_id>/export/', views.house_poll_export, name='house_poll_export'),
     path('house_poll/<str:external_id>/tickets/', views.house_poll_tickets_export, name='house_poll_tickets_export'),
+    path('house_poll/<str:external_id>/tickets/sheet/', views.house_poll_tickets_sheet, name='house_poll_tickets_sheet'),
 
     path('quickpoll/create/', views.quickpoll_create, name='quickpoll_create'),
     path('quickpoll/archive/', views.quickpoll_archive, name='quickpoll_archive'),
@@ -18,5 +19,8 @@ urlpatterns = [
     path('quickpoll/<str:external_id>/results/', views.quickpoll_results, name='quickpoll_results'),
     path('quickpoll/<str:external_id>/export/', views.quickpoll_export, name='quickpoll_export'),
     path('quickpoll/<str:external_id>/tickets/', views.quickpoll_tickets_export, name='quickpoll_tickets_export'),
+    path('quickpoll/<str:external_id>/tickets/sheet/', views.quickpoll_tickets_sheet, name='quickpoll_tickets_sheet'),
     path('poll/join/', views.poll_join, name='poll_join'),
+    path('poll/<str:external_id>/api/vote/', views.poll_vote_api, name='poll_vote_api'),
+    path('poll/<str:external_id>/events/', views.poll_events, name='poll_events'),
 ]
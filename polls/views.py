@@ -1,31 +1,164 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils.translation import gettext as _
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+import json
 from django.utils import timezone
 from django.db import models
 from django import forms
-from django.db.models import Count
+from django.db.models import Count, Max
 from django.db.models.functions import TruncDate
 from django.utils import timezone
-from datetime import timedelta
-from django.core.exceptions import ValidationError
-from .models import HousePoll, QuickPoll, Ticket, Ballot, PollLog
+from django.core.cache import cache
+from django.conf import settings
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta, timezone as dt_timezone
+import hashlib
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from .models import HousePoll, QuickPoll, Ticket, Ballot, PollLog, PollCode, resolve_external_id, ranking_to_choices
 from .forms import HousePollForm, QuickPollForm, VoteForm
+from .events import broadcaster
+from .ratelimit import ratelimit
+from . import ticket_sheets, tracking
+from .exports import EXPORT_FORMATS, aiter_chunks, iter_export, matrix_digest, ballot_key
 from polls.models import HousePoll
 from houses.models import House
+from condorcet_backend.profiling import span
+from condorcet_backend import metrics
 
 MAX_QUICKPOLL = 30
+RESULTS_CACHE_TIMEOUT = 60 * 60 * 24
+TICKET_SHEET_CACHE_TIMEOUT = 60 * 60 * 24
+# Head-to-head tables at least this wide are rendered once and cached
+RESULTS_TABLE_CACHE_MIN_OPTIONS = 20
+# Client cache lifetimes once a poll is finished and can no longer change
+FINISHED_PAGE_MAX_AGE = 60 * 60
+FINISHED_EXPORT_MAX_AGE = 60 * 60 * 24 * 365
+
+# Templates may still touch the database (lazy relations, cache tag...)
+arender = sync_to_async(render)
 
 def get_client_ip(request):
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+        # nginx appends the address it saw; anything before it comes from the client
+        ip = x_forwarded_for.split(',')[-1].strip()
     else:
         ip = request.META.get('REMOTE_ADDR')
     return ip
 
+def poll_validators(poll, *variant):
+    """
+    ETag and Last-Modified (as a timestamp) for a poll page or export.
+    Both move when a ballot is cast (ballot_count_time) or the poll closes;
+    `variant` holds whatever else the response depends on (user, language...).
+    """
+    now = timezone.now()
+    last_modified = poll.created_at
+    for moment in (poll.ballot_count_time, poll.dead_line):
+        if moment and last_modified < moment <= now:
+            last_modified = moment
+    raw = '|'.join(str(part) for part in (
+        poll._meta.model_name, poll.external_id, poll.ballot_count_time, poll.is_finished, *variant
+    ))
+    etag = '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+    return etag, int(last_modified.timestamp())
+
+def not_modified(request, etag, last_modified):
+    """
+    Returns a 304 when the client's copy is still current, else None.
+    Never short-circuits while flash messages are pending, since the cached
+    page would not show them.
+    """
+    if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+        return None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+def set_validators(response, poll, etag, last_modified, public=False, max_age=FINISHED_PAGE_MAX_AGE):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if poll.is_finished:
+        visibility = {'public': True} if public else {'private': True}
+        patch_cache_control(response, max_age=max_age, **visibility)
+    else:
+        # Still changing: clients may keep a copy but must revalidate it
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def export_digest(poll):
+    stats = get_condorcet_stats(poll)
+    return {
+        'poll': poll.external_id,
+        'ballot_count': poll.ballot_count,
+        'last_cursor': str(poll.ballots.aggregate(last=Max('pk'))['last'] or 0),
+        'matrix_digest': matrix_digest(stats['matrix']),
+    }
+
+def export_response(request, poll, filename_prefix):
+    """
+    Streams the ballots of a finished poll as ?format=json (default),
+    ndjson or csv. ?since=<ballot id or ISO timestamp> and ?limit=<n> select
+    the ballots after a cursor; the cursor to resume from is returned in
+    the X-Next-Cursor header. ?format=digest returns the tally digest instead.
+    """
+    fmt = request.GET.get('format', 'json')
+    if fmt not in EXPORT_FORMATS and fmt != 'digest':
+        return HttpResponse(_("Unknown export format."), status=400)
+
+    since = request.GET.get('since', '').strip()
+    limit = request.GET.get('limit', '').strip()
+    ballots = poll.ballots.all()
+    if since.isdigit():
+        ballots = ballots.filter(pk__gt=int(since))
+    elif since:
+        moment = parse_datetime(since)
+        if moment is None:
+            return HttpResponse(_("Invalid cursor."), status=400)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment, dt_timezone.utc)
+        ballots = ballots.filter(timestamp__gt=moment)
+    if limit and not (limit.isdigit() and int(limit) > 0):
+        return HttpResponse(_("Invalid limit."), status=400)
+
+    etag, last_modified = poll_validators(poll, 'export', fmt, since, limit)
+    response = not_modified(request, etag, last_modified)
+    if response:
+        return response
+
+    if fmt == 'digest':
+        response = JsonResponse(export_digest(poll))
+        return set_validators(response, poll, etag, last_modified, public=True, max_age=FINISHED_EXPORT_MAX_AGE)
+
+    # Pin the upper bound before streaming so the cursor matches the content
+    if limit:
+        page = list(ballots.order_by('pk').values_list('pk', flat=True)[:int(limit)])
+        last = page[-1] if page else None
+    else:
+        last = ballots.aggregate(last=Max('pk'))['last']
+    if last is not None:
+        ballots = ballots.filter(pk__lte=last)
+        next_cursor = last
+    else:
+        ballots = ballots.none()
+        next_cursor = since or 0
+
+    content = iter_export(poll, fmt, ballots)
+    if isinstance(request, ASGIRequest):
+        # A sync iterator would be drained into memory before the first byte under ASGI
+        content = aiter_chunks(content)
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename_prefix}_{poll.external_id}_results.{fmt}"'
+    response['X-Next-Cursor'] = str(next_cursor)
+    return set_validators(response, poll, etag, last_modified, public=True, max_age=FINISHED_EXPORT_MAX_AGE)
+
 def calculate_condorcet(poll):
     """
     Calculates Condorcet head-to-head match-ups for the given poll.
@@ -34,24 +167,22 @@ def calculate_condorcet(poll):
     # Initialize matrix: matrix[A][B] = number of times A beats B
     matrix = {opt1: {opt2: 0 for opt2 in options} for opt1 in options}
     
-    for ballot in poll.ballots.all():
-        if not isinstance(ballot.choices, dict):
+    for choices in poll.ballots.values_list('choices', flat=True).iterator():
+        if not isinstance(choices, dict):
             continue
             
-        choices = ballot.choices
+        # If a rank is missing, treat it as worst possible rank (infinity)
+        values = []
+        for opt in options:
+            rank = choices.get(opt)
+            values.append(float('inf') if rank is None else float(rank))
+
         for i, opt1 in enumerate(options):
+            row = matrix[opt1]
+            val1 = values[i]
             for j, opt2 in enumerate(options):
-                if i == j:
-                    continue
-                rank1 = choices.get(opt1)
-                rank2 = choices.get(opt2)
-                
-                # If a rank is missing, treat it as worst possible rank (infinity)
-                val1 = float('inf') if rank1 is None else float(rank1)
-                val2 = float('inf') if rank2 is None else float(rank2)
-                
-                if val1 < val2:
-                    matrix[opt1][opt2] += 1
+                if val1 < values[j]:
+                    row[opt2] += 1
 
     wins_count = {opt: 0 for opt in options}
     losses_count = {opt: 0 for opt in options}
@@ -88,7 +219,59 @@ def calculate_condorcet(poll):
         'wins_count': wins_count,
         'losses_count': losses_count,
         'ties_count': ties_count,
-        'options': sorted_options
+        'options': sorted_options,
+        'table': build_results_table(matrix, sorted_options, wins_count, losses_count, ties_count),
+    }
+
+def build_results_table(matrix, options, wins_count, losses_count, ties_count):
+    """
+    Pre-orders the head-to-head matrix so the template renders it in a single
+    pass: one row per option, one cell per opponent, in ranking order.
+    """
+    table = []
+    for opt1 in options:
+        cells = []
+        for opt2 in options:
+            if opt1 == opt2:
+                cells.append({'value': None, 'margin': None, 'css': 'h2h-self'})
+                continue
+            wins = matrix[opt1][opt2]
+            margin = wins - matrix[opt2][opt1]
+            css = 'h2h-win' if margin > 0 else 'h2h-loss' if margin < 0 else 'h2h-tie'
+            cells.append({'value': wins, 'margin': margin, 'css': css})
+        table.append({
+            'option': opt1,
+            'cells': cells,
+            'wins': wins_count[opt1],
+            'losses': losses_count[opt1],
+            'ties': ties_count[opt1],
+        })
+    return table
+
+def get_condorcet_stats(poll):
+    """
+    Results of a finished poll never change, so the tally is computed once
+    per poll state and kept in the cache.
+    """
+    version = poll.ballot_count_time.timestamp() if poll.ballot_count_time else 0
+    key = f"condorcet:{poll._meta.model_name}:{poll.pk}:{version}"
+    stats = cache.get(key)
+    metrics.count_cache('results', stats is not None)
+    if stats is None:
+        ballots = metrics.ballots_label(getattr(poll, 'ballot_count', 0))
+        with span('tally'), metrics.TALLY_SECONDS.labels(ballots).time():
+            stats = calculate_condorcet(poll)
+        cache.set(key, stats, RESULTS_CACHE_TIMEOUT)
+    return stats
+
+def results_context(poll, is_creator, condorcet_stats=None):
+    if condorcet_stats is None and poll.is_finished:
+        condorcet_stats = get_condorcet_stats(poll)
+    return {
+        'poll': poll,
+        'condorcet_stats': condorcet_stats,
+        'cache_results_table': len(poll.options) >= RESULTS_TABLE_CACHE_MIN_OPTIONS,
+        'is_creator': is_creator
     }
 
 def house_poll_create(request, house_pk):
@@ -103,17 +286,20 @@ def house_poll_create(request, house_pk):
         form = HousePollForm()
     return render(request, 'polls/house_poll_form.html', {'form': form, 'house': house})
 
-def house_poll_detail(request, external_id):
-    poll = get_object_or_404(HousePoll, external_id=external_id)
+async def house_poll_detail(request, external_id):
+    poll = await aget_object_or_404(HousePoll.objects.with_ballot_count(), external_id=external_id)
+    user = await request.auser()
     
     # If the poll is finished or user has already voted, redirect to results
-    if poll.is_finished or (request.user.is_authenticated and poll.ballots.filter(voter=request.user).exists()):
+    if poll.is_finished or (user.is_authenticated and await poll.ballots.filter(voter=user).aexists()):
         return redirect('polls:house_poll_results', external_id=external_id)
         
-    return render(request, 'polls/house_poll_detail.html', {'poll': poll})
+    return await arender(request, 'polls/house_poll_detail.html', {'poll': poll})
 
-def house_poll_vote(request, external_id):
-    poll = get_object_or_404(HousePoll, external_id=external_id)
+@ratelimit('vote', methods=('POST',))
+async def house_poll_vote(request, external_id):
+    poll = await aget_object_or_404(HousePoll.objects.with_ballot_count(), external_id=external_id)
+    user = await request.auser()
     if poll.is_finished:
         messages.error(request, _("Poll is closed."))
         return redirect('polls:house_poll_results', external_id=external_id)
@@ -122,106 +308,162 @@ def house_poll_vote(request, external_id):
         form = VoteForm(request.POST, poll=poll)
         if form.is_valid():
             try:
-                poll.save_ballot(
-                    choices=form.get_ranked_choices(),
-                    user=request.user,
-                    ticket_code=form.cleaned_data.get('ticket_code'),
-                    ip_address=get_client_ip(request)
-                )
+                # save_ballot claims the ticket in a transaction, keep it on the sync side
+                with metrics.observe_vote('house'):
+                    await sync_to_async(poll.save_ballot)(
+                        choices=form.get_ranked_choices(),
+                        user=user,
+                        ticket_code=form.cleaned_data.get('ticket_code'),
+                        ip_address=get_client_ip(request)
+                    )
+                broadcaster.notify(poll)
                 messages.success(request, _("Vote cast successfully!"))
                 return redirect('polls:house_poll_results', external_id=external_id)
             except ValueError as e:
                 messages.error(request, str(e))
     else:
-        poll.log_action('VISIT', user=request.user, ip_address=get_client_ip(request))
-        form = VoteForm(poll=poll)
+        await poll.alog_action('VISIT', user=user, ip_address=get_client_ip(request))
+        form = VoteForm(poll=poll, initial={'ticket_code': request.GET.get('ticket', '')})
     
     is_creator = False
-    if poll.creator == request.user:
+    if poll.creator_id == user.pk:
         is_creator = True
 
-    return render(request, 'polls/poll_vote.html', {'form': form, 'poll': poll, 'is_creator': is_creator})
+    return await arender(request, 'polls/poll_vote.html', {'form': form, 'poll': poll, 'is_creator': is_creator})
 
-def house_poll_results(request, external_id):
-    poll = get_object_or_404(HousePoll, external_id=external_id)
-    poll.log_action('VISIT', user=request.user, ip_address=get_client_ip(request))
-    if not poll.is_finished:
-         messages.info(request, _("Poll is still in progress. Check back later."))
-         condorcet_stats = None
-    else:
-         condorcet_stats = calculate_condorcet(poll)
+def apply_governance(request, poll, condorcet_stats):
+    """
+    Applies the outcome of a finished governance poll (integration,
+    banishment, deletion). Returns a response when the visitor has to be
+    sent elsewhere, None otherwise.
+    """
+    if poll.poll_type == HousePoll.POLL_TYPE_INTEGRATION:
+        if 'Approve' in condorcet_stats['winners'] and len(condorcet_stats['winners']) == 1:
+            import re
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+        
+            # Extract the username from the standardized question string
+            match = re.search(r"Should we integrate (.+) into", poll.question)
+            if match:
+                username = match.group(1)
+                try:
+                    user = User.objects.get(username=username)
+                    user.houses.add(poll.house)
+                except User.DoesNotExist:
+                    pass
+                
+    elif poll.poll_type == HousePoll.POLL_TYPE_BANISHMENT:
+        if 'Approve' in condorcet_stats['winners'] and len(condorcet_stats['winners']) == 1:
+            import re
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+        
+            # Extract the username from the standardized question string
+            match = re.search(r"Should we banish (.+) from", poll.question)
+            if match:
+                username = match.group(1)
+                try:
+                    user = User.objects.get(username=username)
+                    user.houses.remove(poll.house)
+                except User.DoesNotExist:
+                    pass
+                
+    elif poll.poll_type == HousePoll.POLL_TYPE_DELETION:
+        if 'Approve' in condorcet_stats['winners'] and len(condorcet_stats['winners']) == 1:
+            # Delete the house (which will cascade and delete its polls)
+            poll.house.delete()
+            messages.warning(request, _("The house has been deleted following the successful deletion poll."))
+            return redirect('houses:house_list')
+    return None
+
+async def house_poll_results(request, external_id):
+    poll = await aget_object_or_404(
+        HousePoll.objects.with_ballot_count().select_related('house'), external_id=external_id
+    )
+    user = await request.auser()
+    await poll.alog_action('VISIT', user=user, ip_address=get_client_ip(request))
+    # The tally runs in a worker thread so it does not hold up the event loop
+    condorcet_stats = await sync_to_async(get_condorcet_stats)(poll) if poll.is_finished else None
     
     # Apply governance logic if finished and approved
     if poll.is_finished:
-        if poll.poll_type == HousePoll.POLL_TYPE_INTEGRATION:
-            if 'Approve' in condorcet_stats['winners'] and len(condorcet_stats['winners']) == 1:
-                import re
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-            
-                # Extract the username from the standardized question string
-                match = re.search(r"Should we integrate (.+) into", poll.question)
-                if match:
-                    username = match.group(1)
-                    try:
-                        user = User.objects.get(username=username)
-                        user.houses.add(poll.house)
-                    except User.DoesNotExist:
-                        pass
-                    
-        elif poll.poll_type == HousePoll.POLL_TYPE_BANISHMENT:
-            if 'Approve' in condorcet_stats['winners'] and len(condorcet_stats['winners']) == 1:
-                import re
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-            
-                # Extract the username from the standardized question string
-                match = re.search(r"Should we banish (.+) from", poll.question)
-                if match:
-                    username = match.group(1)
-                    try:
-                        user = User.objects.get(username=username)
-                        user.houses.remove(poll.house)
-                    except User.DoesNotExist:
-                        pass
-                    
-        elif poll.poll_type == HousePoll.POLL_TYPE_DELETION:
-            if 'Approve' in condorcet_stats['winners'] and len(condorcet_stats['winners']) == 1:
-                # Delete the house (which will cascade and delete its polls)
-                poll.house.delete()
-                messages.warning(request, _("The house has been deleted following the successful deletion poll."))
-                return redirect('houses:house_list')
+        response = await sync_to_async(apply_governance)(request, poll, condorcet_stats)
+        if response:
+            return response
                  
     is_creator = False
-    if poll.creator == request.user:
+    if poll.creator_id == user.pk:
         is_creator = True
 
-    return render(request, 'polls/poll_results.html', {
-        'poll': poll, 
-        'condorcet_stats': condorcet_stats,
-        'is_creator': is_creator
-    })
+    etag, last_modified = poll_validators(poll, user.pk, is_creator, request.LANGUAGE_CODE)
+    response = await sync_to_async(not_modified)(request, etag, last_modified)
+    if response:
+        return response
 
+    if not poll.is_finished:
+        messages.info(request, _("Poll is still in progress. Check back later."))
+
+    response = await arender(request, 'polls/poll_results.html', results_context(poll, is_creator, condorcet_stats))
+    return set_validators(response, poll, etag, last_modified)
+
+@gzip_page
 def house_poll_export(request, external_id):
-    poll = get_object_or_404(HousePoll, external_id=external_id)
+    poll = get_object_or_404(HousePoll.objects.with_ballot_count(), external_id=external_id)
     if not poll.is_finished:
         return HttpResponse(_("Poll is not finished."), status=403)
-    results = poll.get_results_json()
-    response = HttpResponse(results, content_type='application/json')
-    response['Content-Disposition'] = f'attachment; filename="house_poll_{external_id}_results.json"'
-    return response
+    return export_response(request, poll, 'house_poll')
 
+@ratelimit('tickets')
 def house_poll_tickets_export(request, external_id):
-    poll = get_object_or_404(HousePoll, external_id=external_id)
+    poll = get_object_or_404(HousePoll.objects.with_ballot_count(), external_id=external_id)
     
     # Check if user is the creator and poll is still active
-    if not (poll.is_ticket_secured and not poll.is_finished and request.user == poll.creator):
+    if not (poll.is_ticket_secured and not poll.is_finished and request.user.pk == poll.creator_id):
         return HttpResponse("Unauthorized or poll finished.", status=403)
+
+    # Tickets are claimed by votes, which also move ballot_count_time
+    etag, last_modified = poll_validators(poll, 'tickets', request.user.pk)
+    response = not_modified(request, etag, last_modified)
+    if response:
+        return response
         
-    tickets = [ticket.code for ticket in poll.tickets.all() if not ticket.is_used]
+    tickets = poll.tickets.filter(is_used=False).values_list('code', flat=True)
     response = HttpResponse('\n'.join(tickets), content_type='text/plain')
     response['Content-Disposition'] = f'attachment; filename="house_poll_{external_id}_tickets.txt"'
-    return response
+    return set_validators(response, poll, etag, last_modified)
+
+async def tickets_sheet_response(request, poll, vote_url_name, filename_prefix):
+    """
+    PDF of the unused tickets, one QR code per ticket linking to the vote
+    page with the code filled in. Drawn in the ticket sheet process pool and
+    cached until a vote claims a ticket.
+    """
+    # The QR codes hold absolute links in the current language
+    etag, last_modified = poll_validators(poll, 'tickets', 'pdf', request.get_host(), request.LANGUAGE_CODE)
+    response = await sync_to_async(not_modified)(request, etag, last_modified)
+    if response:
+        return response
+
+    cache_key = f"ticket-sheet:{etag}"
+    pdf = await cache.aget(cache_key)
+    if pdf is None:
+        codes = [code async for code in poll.tickets.filter(is_used=False).order_by('pk').values_list('code', flat=True)]
+        vote_url = request.build_absolute_uri(reverse(vote_url_name, args=[poll.external_id]))
+        pdf = await ticket_sheets.render(poll.question, vote_url, codes, settings.TICKET_SHEET_WORKERS)
+        await cache.aset(cache_key, pdf, TICKET_SHEET_CACHE_TIMEOUT)
+
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename_prefix}_{poll.external_id}_tickets.pdf"'
+    return set_validators(response, poll, etag, last_modified)
+
+@ratelimit('tickets')
+async def house_poll_tickets_sheet(request, external_id):
+    poll = await aget_object_or_404(HousePoll.objects.with_ballot_count(), external_id=external_id)
+    user = await request.auser()
+    if not (poll.is_ticket_secured and not poll.is_finished and user.pk == poll.creator_id):
+        return HttpResponse("Unauthorized or poll finished.", status=403)
+    return await tickets_sheet_response(request, poll, 'polls:house_poll_vote', 'house_poll')
 
 # QuickPolls
 
@@ -242,42 +484,46 @@ def quickpoll_create(request):
 
             messages.success(request, _("QuickPoll created. ID: %(external_id)s") % {'external_id': poll.external_id})
             
-            # Save the created poll's ID in the session
-            created_polls = request.session.get('created_quickpolls', [])
-            created_polls.append(str(poll.external_id))
-            request.session['created_quickpolls'] = created_polls
-            
-            return redirect('polls:quickpoll_detail', external_id=poll.external_id)
+            # Remember on this device that it created the poll
+            response = redirect('polls:quickpoll_detail', external_id=poll.external_id)
+            return tracking.track(request, response, tracking.CREATED, poll.external_id)
     else:
         form = QuickPollForm()
     return render(request, 'polls/quickpoll_form.html', {'form': form})
 
-def quickpoll_detail(request, external_id):
-    poll = get_object_or_404(QuickPoll, external_id=external_id)
+def is_quickpoll_creator(request, poll, user):
+    """
+    Whether the visitor created this quick poll, either while logged in
+    or anonymously from this browser.
+    """
+    if user.is_authenticated and poll.owner_id == user.pk:
+        return True
+    return tracking.is_tracked(request, tracking.CREATED, poll.external_id)
+
+async def quickpoll_detail(request, external_id):
+    poll = await aget_object_or_404(QuickPoll.objects.with_ballot_count(), external_id=external_id)
+    user = await request.auser()
     
     # If the poll is finished or user has already voted, redirect to results
-    voted_polls = request.session.get('voted_quickpolls', [])
-    if poll.is_finished or str(external_id) in voted_polls or (request.user.is_authenticated and poll.ballots.filter(voter=request.user).exists()):
+    voted_here = tracking.is_tracked(request, tracking.VOTED, external_id)
+    if poll.is_finished or voted_here or (user.is_authenticated and await poll.ballots.filter(voter=user).aexists()):
         return redirect('polls:quickpoll_results', external_id=external_id)
     
     # Check if the user created this poll
-    is_creator = False
-    if request.user.is_authenticated and poll.owner == request.user:
-        is_creator = True
-    elif str(external_id) in request.session.get('created_quickpolls', []):
-        is_creator = True
+    is_creator = is_quickpoll_creator(request, poll, user)
 
-    return render(request, 'polls/quickpoll_detail.html', {'poll': poll, 'is_creator': is_creator})
+    return await arender(request, 'polls/quickpoll_detail.html', {'poll': poll, 'is_creator': is_creator})
 
-def quickpoll_vote(request, external_id):
-    poll = get_object_or_404(QuickPoll, external_id=external_id)
+@ratelimit('vote', methods=('POST',))
+async def quickpoll_vote(request, external_id):
+    poll = await aget_object_or_404(QuickPoll.objects.with_ballot_count(), external_id=external_id)
+    user = await request.auser()
     if poll.is_finished:
         messages.error(request, _("Poll is closed."))
         return redirect('polls:quickpoll_results', external_id=external_id)
         
-    # Check session to prevent duplicate voting from the same computer
-    voted_polls = request.session.get('voted_quickpolls', [])
-    if str(external_id) in voted_polls:
+    # Check the device cookie to prevent duplicate voting from the same computer
+    if tracking.is_tracked(request, tracking.VOTED, external_id):
         messages.error(request, _("You have already voted in this poll from this device."))
         return redirect('polls:quickpoll_detail', external_id=external_id)
 
@@ -285,114 +531,185 @@ def quickpoll_vote(request, external_id):
         form = VoteForm(request.POST, poll=poll)
         if form.is_valid():
             try:
-                poll.save_ballot(
-                    choices=form.get_ranked_choices(),
-                    user=request.user if request.user.is_authenticated else None,
-                    ticket_code=form.cleaned_data.get('ticket_code'),
-                    ip_address=get_client_ip(request)
-                )
-                
-                # Record the vote in the session
-                voted_polls.append(str(external_id))
-                request.session['voted_quickpolls'] = voted_polls
+                with metrics.observe_vote('quick'):
+                    await sync_to_async(poll.save_ballot)(
+                        choices=form.get_ranked_choices(),
+                        user=user if user.is_authenticated else None,
+                        ticket_code=form.cleaned_data.get('ticket_code'),
+                        ip_address=get_client_ip(request)
+                    )
+                broadcaster.notify(poll)
                 
                 messages.success(request, _("Vote cast successfully!"))
-                return redirect('polls:quickpoll_results', external_id=external_id)
+                # Record the vote on this device
+                response = redirect('polls:quickpoll_results', external_id=external_id)
+                return tracking.track(request, response, tracking.VOTED, external_id)
             except ValueError as e:
                 messages.error(request, str(e))
     else:
-        poll.log_action('VISIT', user=request.user, ip_address=get_client_ip(request))
-        form = VoteForm(poll=poll)
+        await poll.alog_action('VISIT', user=user, ip_address=get_client_ip(request))
+        form = VoteForm(poll=poll, initial={'ticket_code': request.GET.get('ticket', '')})
     
     # Check if the user created this poll
-    is_creator = False
-    if request.user.is_authenticated and poll.owner == request.user:
-        is_creator = True
-    elif str(external_id) in request.session.get('created_quickpolls', []):
-        is_creator = True
+    is_creator = is_quickpoll_creator(request, poll, user)
 
-    return render(request, 'polls/poll_vote.html', {'form': form, 'poll': poll, 'is_creator': is_creator})
+    return await arender(request, 'polls/poll_vote.html', {'form': form, 'poll': poll, 'is_creator': is_creator})
 
-def quickpoll_results(request, external_id):
-    poll = get_object_or_404(QuickPoll, external_id=external_id)
-    poll.log_action('VISIT', user=request.user, ip_address=get_client_ip(request))
+async def quickpoll_results(request, external_id):
+    poll = await aget_object_or_404(QuickPoll.objects.with_ballot_count(), external_id=external_id)
+    user = await request.auser()
+    await poll.alog_action('VISIT', user=user, ip_address=get_client_ip(request))
     
+    # Check if the user created this poll
+    is_creator = is_quickpoll_creator(request, poll, user)
+
+    etag, last_modified = poll_validators(poll, user.pk, is_creator, request.LANGUAGE_CODE)
+    response = await sync_to_async(not_modified)(request, etag, last_modified)
+    if response:
+        return response
+
     if not poll.is_finished:
         messages.info(request, _("Poll is still in progress. Check back later."))
         condorcet_stats = None
     else:
-        condorcet_stats = calculate_condorcet(poll)
-    
-    # Check if the user created this poll
-    is_creator = False
-    if request.user.is_authenticated and poll.owner == request.user:
-        is_creator = True
-    elif str(external_id) in request.session.get('created_quickpolls', []):
-        is_creator = True
+        # The tally runs in a worker thread so it does not hold up the event loop
+        condorcet_stats = await sync_to_async(get_condorcet_stats)(poll)
 
-    return render(request, 'polls/poll_results.html', {
-        'poll': poll, 
-        'condorcet_stats': condorcet_stats,
-        'is_creator': is_creator
-    })
+    response = await arender(request, 'polls/poll_results.html', results_context(poll, is_creator, condorcet_stats))
+    return set_validators(response, poll, etag, last_modified)
 
+@gzip_page
 def quickpoll_export(request, external_id):
-    poll = get_object_or_404(QuickPoll, external_id=external_id)
+    poll = get_object_or_404(QuickPoll.objects.with_ballot_count(), external_id=external_id)
     if not poll.is_finished:
         return HttpResponse(_("Poll is not finished."), status=403)
-    results = poll.get_results_json()
-    response = HttpResponse(results, content_type='application/json')
-    response['Content-Disposition'] = f'attachment; filename="quickpoll_{external_id}_results.json"'
-    return response
+    return export_response(request, poll, 'quickpoll')
 
+@ratelimit('tickets')
 def quickpoll_tickets_export(request, external_id):
-    poll = get_object_or_404(QuickPoll, external_id=external_id)
+    poll = get_object_or_404(QuickPoll.objects.with_ballot_count(), external_id=external_id)
     
-    # Check if user is the creator (via auth or session) and poll is still active
-    is_creator = False
-    if request.user.is_authenticated and poll.owner == request.user:
-        is_creator = True
-    elif str(external_id) in request.session.get('created_quickpolls', []):
-        is_creator = True
+    # Check if user is the creator (via auth or device cookie) and poll is still active
+    is_creator = is_quickpoll_creator(request, poll, request.user)
 
     if not (poll.is_ticket_secured and not poll.is_finished and is_creator):
         return HttpResponse(_("Unauthorized or poll finished."), status=403)
+
+    # Tickets are claimed by votes, which also move ballot_count_time
+    etag, last_modified = poll_validators(poll, 'tickets')
+    response = not_modified(request, etag, last_modified)
+    if response:
+        return response
         
-    tickets = [ticket.code for ticket in poll.tickets.all() if not ticket.is_used]
+    tickets = poll.tickets.filter(is_used=False).values_list('code', flat=True)
     response = HttpResponse('\n'.join(tickets), content_type='text/plain')
     response['Content-Disposition'] = f'attachment; filename="quickpoll_{external_id}_tickets.txt"'
-    return response
+    return set_validators(response, poll, etag, last_modified)
+
+@ratelimit('tickets')
+async def quickpoll_tickets_sheet(request, external_id):
+    poll = await aget_object_or_404(QuickPoll.objects.with_ballot_count(), external_id=external_id)
+    user = await request.auser()
+    if not (poll.is_ticket_secured and not poll.is_finished and is_quickpoll_creator(request, poll, user)):
+        return HttpResponse(_("Unauthorized or poll finished."), status=403)
+    return await tickets_sheet_response(request, poll, 'polls:quickpoll_vote', 'quickpoll')
 
 def quickpoll_archive(request):
-    # Wait, queryset for is_finished is hard to do directly in filter for properties.
-    # Let's just grab all and filter in python for now or use annotation if needed.
-    all_polls = QuickPoll.objects.annotate(
-        ballot_count=models.Count('ballots')
-    ).order_by('-ballot_count_time')[:MAX_QUICKPOLL]
-    finished_polls = [p for p in all_polls if p.is_finished]
+    finished_polls = QuickPoll.objects.finished().order_by('-ballot_count_time')[:MAX_QUICKPOLL]
     return render(request, 'polls/quickpoll_archive.html', {'polls': finished_polls})
 
-def poll_join(request):
+@ratelimit('join', methods=('POST',))
+async def poll_join(request):
     if request.method == 'POST':
         poll_id = request.POST.get('poll_id', '').strip()
         if poll_id:
             try:
-                # Try QuickPoll first
-                poll = QuickPoll.objects.get(external_id=poll_id)
-                return redirect('polls:quickpoll_detail', external_id=poll.external_id)
-            except QuickPoll.DoesNotExist:
-                try:
-                    # Then try HousePoll
-                    poll = HousePoll.objects.get(external_id=poll_id)
-                    return redirect('polls:house_poll_detail', external_id=poll.external_id)
-                except HousePoll.DoesNotExist:
-                    messages.error(request, _("Poll not found. Please check the ID."))
-            except (ValidationError, ValueError):
-                messages.error(request, _("Invalid Poll ID."))
+                # One registry lookup (or none, once cached) for any poll kind
+                model, _pk = await sync_to_async(resolve_external_id)(poll_id)
+                return redirect(model.detail_url_name, external_id=poll_id)
+            except PollCode.DoesNotExist:
+                messages.error(request, _("Poll not found. Please check the ID."))
     
     # If it's a GET request or the form had errors, return to home
     return redirect('home')
 
+async def poll_events(request, external_id):
+    """
+    Server-sent events with the live ballot count of a poll and a final
+    "closed" event (see polls.events). Results pages listen to it instead
+    of being reloaded.
+    """
+    try:
+        model, pk = await sync_to_async(resolve_external_id)(external_id)
+    except PollCode.DoesNotExist:
+        raise Http404
+    poll = await model.objects.with_ballot_count().filter(pk=pk).afirst()
+    if poll is None:
+        raise Http404
+
+    response = StreamingHttpResponse(broadcaster.stream(poll), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Let nginx pass events through as soon as they are written
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def parse_vote_payload(body, options):
+    """
+    Validates {"ranking": [option, ...], "ticket": "ABCD1234"} (ticket
+    optional) and returns (choices, ticket_code). Raises ValueError.
+    """
+    try:
+        data = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Body must be JSON.")
+    if not isinstance(data, dict) or set(data) - {'ranking', 'ticket'}:
+        raise ValueError("Expected an object with 'ranking' and optional 'ticket'.")
+    ticket = data.get('ticket')
+    if ticket is not None and not (isinstance(ticket, str) and len(ticket) <= 8):
+        raise ValueError("Invalid ticket.")
+    return ranking_to_choices(options, data.get('ranking')), ticket or None
+
+@csrf_exempt
+@require_POST
+@ratelimit('vote')
+def poll_vote_api(request, external_id):
+    """
+    JSON voting endpoint for embedded widgets and load generators: no form,
+    session, messages or template. Votes are anonymous (the session user is
+    ignored, which is what makes skipping CSRF safe), so it serves QuickPolls
+    and ticket-secured polls. Open QuickPolls get the same device cookie and
+    rate limit as quickpoll_vote.
+
+    Target: 250 votes/s through the Django test client on SQLite
+    (see polls/test_api.py).
+    """
+    try:
+        model, pk = resolve_external_id(external_id)
+        poll = model.objects.with_ballot_count().get(pk=pk)
+    except (PollCode.DoesNotExist, HousePoll.DoesNotExist, QuickPoll.DoesNotExist):
+        return JsonResponse({'error': _("Poll not found.")}, status=404)
+
+    per_device = model is QuickPoll and not poll.is_ticket_secured
+    if per_device and tracking.is_tracked(request, tracking.VOTED, poll.external_id):
+        return JsonResponse({'error': _("You have already voted in this poll from this device.")}, status=400)
+
+    try:
+        choices, ticket_code = parse_vote_payload(request.body, poll.options)
+        with metrics.observe_vote('api'):
+            ballot = poll.save_ballot(choices=choices, ticket_code=ticket_code, ip_address=get_client_ip(request))
+        broadcaster.notify(poll)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    response = JsonResponse({
+        'poll': poll.external_id,
+        'receipt': ballot_key(ballot.pk, ballot.ticket.code if ballot.ticket else None),
+        'cast_at': ballot.timestamp.isoformat(),
+    }, status=201)
+    if per_device:
+        tracking.track(request, response, tracking.VOTED, poll.external_id)
+    return response
+
 def statistics(request):
     # Calculate visitor history for the last 7 days
     seven_days_ago = timezone.now() - timedelta(days=7)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Refills the user search index from the users table, for users created "
+        "without signals (bulk_create, raw SQL). Does nothing outside SQLite."
+    )
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} user(s)."))
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from users import search
+
+
+def create_index(apps, schema_editor):
+    search.create_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_remove_user_house_user_houses'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
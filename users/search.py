@@ -0,0 +1,125 @@
+"""
+Prefix search over usernames and emails.
+
+On SQLite the lookup goes through an FTS5 table (``users_user_search``)
+kept in sync by the signals in ``users.signals``. Rows written without
+signals (bulk_create, raw SQL) are picked up by ``manage.py
+rebuild_user_index``. Other databases fall
+back to an ``istartswith`` filter. Results for hot prefixes are cached
+for a few seconds since autocomplete fires on every keystroke.
+"""
+import hashlib
+import re
+
+from django.core.cache import cache
+from django.db import connection, transaction, OperationalError
+from django.db.models import Q
+
+from condorcet_backend import metrics
+
+SEARCH_TABLE = "users_user_search"
+RESULT_LIMIT = 10
+CACHE_TTL = 30  # seconds
+
+# Same token boundaries as the FTS5 unicode61 tokenizer: anything that is
+# not a letter or a digit (including '_', '.', '@') separates tokens.
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+FILL_SQL = (
+    f"INSERT INTO {SEARCH_TABLE}(rowid, username, email) "
+    "SELECT id, username, COALESCE(email, '') FROM users_user"
+)
+
+
+def uses_fts():
+    return connection.vendor == "sqlite"
+
+
+def create_index(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+        "USING fts5(username, email, tokenize='unicode61', prefix='1 2 3')"
+    )
+    schema_editor.execute(FILL_SQL)
+
+
+def drop_index(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def index_user(user):
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [user.pk])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, username, email) VALUES (%s, %s, %s)",
+            [user.pk, user.username, user.email or ""],
+        )
+
+
+def rebuild_index():
+    """Refills the index from users_user; returns the number of rows indexed."""
+    if not uses_fts():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(FILL_SQL)
+        return cursor.rowcount
+
+
+def unindex_user(user_id):
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [user_id])
+
+
+def search_user_ids(query, limit=RESULT_LIMIT):
+    """
+    Returns up to `limit` user ids whose username or email has a word
+    starting with each term of `query`.
+
+    Matches are not ranked: sorting by bm25 scores every hit, which costs
+    hundreds of milliseconds for one-letter prefixes on a large table.
+    """
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return []
+
+    key = "user-search:%d:%s" % (limit, hashlib.md5(" ".join(tokens).encode()).hexdigest())
+    ids = cache.get(key)
+    metrics.count_cache("user_search", ids is not None)
+    if ids is None:
+        ids = _fts_search(tokens, limit) if uses_fts() else _orm_search(tokens, limit)
+        cache.set(key, ids, CACHE_TTL)
+    return ids
+
+
+def _fts_search(tokens, limit):
+    match = " AND ".join('"%s"*' % token for token in tokens)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+                "LIMIT %s",
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+    except OperationalError:
+        # Index not migrated yet
+        return _orm_search(tokens, limit)
+
+
+def _orm_search(tokens, limit):
+    from django.contrib.auth import get_user_model
+
+    condition = Q()
+    for token in tokens:
+        condition &= Q(username__istartswith=token) | Q(email__istartswith=token)
+    qs = get_user_model().objects.filter(condition).order_by("username")
+    return list(qs.values_list("pk", flat=True)[:limit])
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import User
+
+
+# Fields copied into the search index
+INDEXED_FIELDS = {'username', 'email'}
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    # Fixtures (raw saves) are indexed too; last_login updates and the like are not
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    search.index_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    search.unindex_user(instance.pk)
@@ -1,3 +1,100 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
+
+from houses.models import House
+from polls.models import HousePoll, Ballot
+
+from users.models import User
+from users.search import search_user_ids
+
+
+class UserSearchIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice_martin', email='alice@example.com', password='password')
+        self.bob = User.objects.create_user(username='bob', email='robert@fairpoll.org', password='password')
+
+    def test_prefix_matches_username_and_email(self):
+        self.assertEqual(search_user_ids('ali'), [self.alice.pk])
+        self.assertEqual(search_user_ids('mart'), [self.alice.pk])
+        self.assertEqual(search_user_ids('rob'), [self.bob.pk])
+        self.assertEqual(search_user_ids('fairpoll.o'), [self.bob.pk])
+        self.assertEqual(search_user_ids('zzz'), [])
+
+    def test_index_follows_user_changes(self):
+        self.bob.username = 'charlie'
+        self.bob.save()
+        cache.clear()
+        self.assertEqual(search_user_ids('charl'), [self.bob.pk])
+        self.assertEqual(search_user_ids('bob'), [])
+
+        self.bob.delete()
+        cache.clear()
+        self.assertEqual(search_user_ids('charl'), [])
+
+    def test_result_limit(self):
+        User.objects.bulk_create([User(username=f'voter{i}') for i in range(30)])
+        # bulk_create sends no signal
+        self.assertEqual(search_user_ids('voter'), [])
+        cache.clear()
+        call_command('rebuild_user_index', stdout=StringIO())
+        self.assertEqual(len(search_user_ids('voter', limit=5)), 5)
+
+    def test_only_indexed_fields_reindex(self):
+        self.bob.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            self.bob.save(update_fields=['last_login'])
+        self.bob.email = 'bob@example.org'
+        self.bob.save(update_fields=['email'])
+        self.assertEqual(search_user_ids('example.org'), [self.bob.pk])
+
+    def test_fixtures_are_indexed(self):
+        fixture = Path(tempfile.mkdtemp()) / 'users.json'
+        self.addCleanup(shutil.rmtree, fixture.parent)
+        fixture.write_text(json.dumps([
+            {'model': 'users.user', 'pk': 999, 'fields': {'username': 'loaded', 'password': '!'}},
+        ]))
+        call_command('loaddata', str(fixture), verbosity=0)
+        self.assertEqual(search_user_ids('load'), [999])
+
+    def test_autocomplete_uses_index(self):
+        client = Client()
+        client.login(username='bob', password='password')
+        response = client.get(reverse('houses:user-autocomplete'), {'q': 'alice'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['id'] for r in results], [str(self.alice.pk)])
+
+
+class HomepageTest(TestCase):
+    def test_pending_polls(self):
+        user = User.objects.create_user(username='member', password='password')
+        house = House.objects.create(name='House', creator=user)
+        house.members.add(user)
+        other_house = House.objects.create(name='Other', creator=user)
+
+        def poll(question, days=1, house=house):
+            return HousePoll.objects.create(
+                question=question, options=['Yes', 'No'], house=house, creator=user,
+                dead_line=timezone.now() + timedelta(days=days), max_participants=10,
+            )
+        pending = poll('Pending?')
+        voted = poll('Voted?')
+        Ballot.objects.create(poll=voted, voter=user, choices={'Yes': 1, 'No': 2})
+        poll('Finished?', days=-1)
+        poll('Not my house?', house=other_house)
+
+        client = Client()
+        client.login(username='member', password='password')
+        response = client.get(reverse('users:user_homepage'))
+        self.assertEqual(list(response.context['pending_polls']), [pending])
 
-# Create your tests here.
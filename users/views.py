@@ -4,6 +4,7 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
+from polls.models import HousePoll
 from .forms import UserProfileForm
 
 User = get_user_model()
@@ -19,14 +20,14 @@ def account(request):
 
 @login_required
 def homepage(request):
-    pending_polls = []
-    
-    # Check if the user belongs to houses and find polls they haven't voted in yet
-    for house in request.user.houses.all():
-        for poll in house.polls.all():
-            if not poll.is_finished and not poll.ballots.filter(voter=request.user).exists():
-                pending_polls.append(poll)
-                
+    # Open polls of the user's houses they haven't voted in yet, in one query
+    pending_polls = (
+        HousePoll.objects.filter(house__members=request.user)
+        .active()
+        .exclude(ballots__voter=request.user)
+        .order_by('house_id', 'pk')
+    )
+
     return render(request, "home.html", {"pending_polls": pending_polls})
 
 